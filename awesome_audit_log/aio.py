@@ -0,0 +1,265 @@
+"""
+asyncio audit pipeline, used with ASYNC on and ASYNC_MODE="asyncio".
+
+Under ASGI, ``RequestEntryPointMiddleware`` binds the event loop serving the
+request to the request context. Audit rows captured while serving it, in the
+threads ``asave()``/``adelete()`` and ``sync_to_async`` run code in, are put
+on an ``asyncio.Queue`` owned by that loop. A background task of the loop
+writes them in batches, from threads that are not thread-sensitive, so the
+audit INSERTs don't hold up the thread that runs the sync parts of the
+views. Rows captured outside of a bound loop are written synchronously.
+"""
+
+import asyncio
+import atexit
+import logging
+import threading
+import weakref
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.core.signals import setting_changed
+from django.db import close_old_connections, models
+from django.dispatch import receiver
+
+from awesome_audit_log.conf import get_setting
+from awesome_audit_log.writer import DROP, FLUSH_TIMEOUT, write_batch
+
+logger = logging.getLogger(__name__)
+
+_event_loop: ContextVar[asyncio.AbstractEventLoop | None] = ContextVar(
+    "awesome_audit_log_event_loop", default=None
+)
+
+
+def bind_event_loop() -> None:
+    """Hand the audit rows of the current context to the running event loop."""
+    _event_loop.set(asyncio.get_running_loop())
+
+
+class AsyncioWriter:
+    """Queue and writer task of one event loop."""
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        queue_size: int,
+        batch_size: int,
+        flush_interval: float,
+        queue_full: str,
+    ):
+        self.loop = loop
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_full = queue_full
+        self.dropped = 0
+        # created in the loop, by _start
+        self.queue: asyncio.Queue | None = None
+        self._writing: asyncio.Lock | None = None
+        self._task: asyncio.Task | None = None
+        # rows taken off the queue by the task and not handed to a writer
+        # thread yet, written by whoever stops the task
+        self._batch: list = []
+
+    def put_threadsafe(self, model: type[models.Model], payloads: list) -> bool:
+        """
+        Queue rows from any thread; returns False when the loop is stopped or
+        closed and the rows have to be written some other way.
+        """
+        if not self.loop.is_running():
+            return False
+        try:
+            self.loop.call_soon_threadsafe(self._put, model, payloads)
+        except RuntimeError:
+            return False
+        return True
+
+    def _put(self, model, payloads) -> None:
+        self._start()
+        for payload in payloads:
+            try:
+                self.queue.put_nowait((model, payload))
+            except asyncio.QueueFull:
+                self._handle_full(model, payload)
+
+    def _handle_full(self, model, payload) -> None:
+        # the loop can't block: rows that don't fit are written by a thread
+        # of the default executor unless they are dropped, "block" included
+        if self.queue_full != DROP:
+            self.loop.run_in_executor(None, _write_in_thread, [(model, payload)])
+            return
+        self.dropped += 1
+        if self.dropped == 1 or self.dropped % 1000 == 0:
+            logger.warning(
+                "Audit writer queue is full, %d audit rows dropped so far",
+                self.dropped,
+            )
+
+    def _start(self) -> None:
+        if self.queue is None:
+            self.queue = asyncio.Queue(maxsize=self.queue_size)
+            self._writing = asyncio.Lock()
+        if self._task is None or self._task.done():
+            self._task = self.loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            row = await self.queue.get()
+            self._batch.append(row)
+            async with self._writing:
+                deadline = self.loop.time() + self.flush_interval
+                while len(self._batch) < self.batch_size:
+                    timeout = deadline - self.loop.time()
+                    if timeout <= 0:
+                        break
+                    # wait_for raises asyncio.TimeoutError, not the builtin
+                    # TimeoutError, before Python 3.11
+                    try:
+                        row = await asyncio.wait_for(self.queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                    self._batch.append(row)
+                batch, self._batch = self._batch, []
+                if batch:
+                    await _write(batch)
+
+    async def aflush(self) -> None:
+        """Write every queued row now."""
+        if self.queue is None:
+            return
+        async with self._writing:
+            batch = self._drain()
+            if batch:
+                await _write(batch)
+
+    async def aclose(self) -> None:
+        """Stop the writer task and write every queued row."""
+        if self.queue is None:
+            return
+        async with self._writing:
+            batch = self._stop()
+        if batch:
+            await _write(batch)
+
+    def stop(self) -> list:
+        """
+        Stop the writer task, from any thread, and return the rows left to
+        write; they must be written outside of the loop.
+        """
+        if not self.loop.is_running() or _running_loop() is self.loop:
+            return self._stop()
+        future = asyncio.run_coroutine_threadsafe(self._astop(), self.loop)
+        try:
+            return future.result(FLUSH_TIMEOUT)
+        except Exception:
+            # the loop is busy or was stopped meanwhile
+            future.cancel()
+            logger.warning("Could not stop the audit writer task of %r", self.loop)
+            return []
+
+    async def _astop(self) -> list:
+        return self._stop()
+
+    def _stop(self) -> list:
+        # run in the loop, or once it's stopped
+        task, self._task = self._task, None
+        if task is not None:
+            try:
+                task.cancel()
+            except RuntimeError:
+                # the loop is closed, the task won't run again
+                pass
+        return self._drain()
+
+    def _drain(self) -> list:
+        batch, self._batch = self._batch, []
+        while self.queue is not None:
+            try:
+                batch.append(self.queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+
+def _write_in_thread(batch: list) -> None:
+    # the connections of executor threads are not managed by Django
+    close_old_connections()
+    write_batch(batch)
+
+
+async def _write(batch: list) -> None:
+    await sync_to_async(_write_in_thread, thread_sensitive=False)(batch)
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+_writers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncioWriter]" = (
+    weakref.WeakKeyDictionary()
+)
+_writers_lock = threading.Lock()
+
+
+def get_asyncio_writer() -> AsyncioWriter | None:
+    """
+    Return the writer of the event loop bound to the current context, None
+    when ASYNC_MODE isn't "asyncio" or no open loop is bound.
+    """
+    if not get_setting("ASYNC") or get_setting("ASYNC_MODE") != "asyncio":
+        return None
+    loop = _event_loop.get()
+    if loop is None or loop.is_closed():
+        return None
+    with _writers_lock:
+        writer = _writers.get(loop)
+        if writer is None:
+            writer = _writers[loop] = AsyncioWriter(
+                loop,
+                queue_size=get_setting("ASYNC_QUEUE_SIZE"),
+                batch_size=get_setting("ASYNC_BATCH_SIZE"),
+                flush_interval=get_setting("ASYNC_FLUSH_INTERVAL"),
+                queue_full=get_setting("ASYNC_QUEUE_FULL"),
+            )
+    return writer
+
+
+async def aflush_audit_writer() -> None:
+    """Write the rows queued on the running loop, e.g. on ASGI shutdown."""
+    writer = _writers.get(asyncio.get_running_loop())
+    if writer is not None:
+        await writer.aflush()
+
+
+def _close_writers() -> None:
+    """Stop the writer tasks and write what is left in their queues."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        batch = writer.stop()
+        if not batch:
+            continue
+        if _running_loop() is None:
+            write_batch(batch)
+        else:
+            # the sync write must not run in the loop
+            thread = threading.Thread(target=_write_in_thread, args=(batch,))
+            thread.start()
+            thread.join()
+
+
+@receiver(setting_changed)
+def _reset_asyncio_writers(setting, **kwargs):
+    if setting == "AWESOME_AUDIT_LOG":
+        _close_writers()
+
+
+@atexit.register
+def _flush_at_exit() -> None:
+    # the loops are stopped by now
+    _close_writers()
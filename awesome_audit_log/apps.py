@@ -1,3 +1,5 @@
+import sys
+
 from django.apps import AppConfig
 
 from awesome_audit_log.conf import get_setting
@@ -10,14 +12,22 @@ class AwesomeAuditLogConfig(AppConfig):
 
     def ready(self):
         if get_setting("ENABLED"):
-            from . import signals  # noqa: F401
+            from . import signals
+
+            signals.connect_audit_receivers()
+            self._setup_refresh_tracking()
+            self._setup_bulk_auditing()
+            self._setup_delete_auditing()
 
             if get_setting("CAPTURE_COMMANDS"):
                 self._setup_command_auditing()
 
-            if get_setting("CAPTURE_CELERY"):
+            if get_setting("CAPTURE_CELERY") and _uses_celery():
                 self._setup_celery_auditing()
 
+            if _uses_celery():
+                self._setup_celery_writer_flush()
+
     def _setup_command_auditing(self):
         """
         Wrap Django's BaseCommand.execute() to capture context.
@@ -96,11 +106,122 @@ class AwesomeAuditLogConfig(AppConfig):
 
         BaseCommand.execute = execute_with_audit
 
+    def _setup_refresh_tracking(self):
+        """
+        Wrap Model.refresh_from_db() so the loaded state kept with
+        TRACK_LOADED_STATE follows the reloaded values.
+        """
+        from django.db.models import Model
+
+        from awesome_audit_log.signals import refresh_loaded_state
+
+        original_refresh_from_db = Model.refresh_from_db
+
+        def refresh_from_db_with_audit(self, using=None, fields=None, **kwargs):
+            original_refresh_from_db(self, using=using, fields=fields, **kwargs)
+            refresh_loaded_state(self, fields)
+
+        Model.refresh_from_db = refresh_from_db_with_audit
+
+    def _setup_bulk_auditing(self):
+        """
+        Wrap QuerySet.bulk_create(), bulk_update() and update() so they are
+        audited for models with CAPTURE_BULK_OPERATIONS on. They don't send
+        model signals.
+        """
+        import inspect
+
+        from django.db import transaction
+        from django.db.models.query import QuerySet
+
+        from awesome_audit_log import bulk
+        from awesome_audit_log.plans import get_audit_plan
+
+        original_bulk_create = QuerySet.bulk_create
+        original_bulk_update = QuerySet.bulk_update
+        original_update = QuerySet.update
+
+        def _audits_bulk(queryset):
+            plan = get_audit_plan(queryset.model)
+            return plan.audited and plan.capture_bulk
+
+        bulk_create_signature = inspect.signature(original_bulk_create)
+
+        def bulk_create_with_audit(self, objs, *args, **kwargs):
+            if not _audits_bulk(self):
+                return original_bulk_create(self, objs, *args, **kwargs)
+            options = bulk_create_signature.bind(self, objs, *args, **kwargs)
+            options.apply_defaults()
+            options = options.arguments
+            if options["ignore_conflicts"]:
+                # which of the objects were inserted isn't known
+                return original_bulk_create(self, objs, *args, **kwargs)
+            if not options["update_conflicts"]:
+                objs = original_bulk_create(self, objs, *args, **kwargs)
+                bulk.audit_bulk_create(self.model, objs)
+                return objs
+            objs = list(objs)
+            with transaction.atomic(using=self.db, savepoint=False):
+                conflicting = bulk.ConflictingRows(self.model, options["unique_fields"])
+                conflicting.fetch(self, objs, options["batch_size"])
+                objs = original_bulk_create(self, objs, *args, **kwargs)
+                bulk.audit_bulk_create(
+                    self.model, objs, conflicting, options["update_fields"]
+                )
+            return objs
+
+        def bulk_update_with_audit(self, objs, fields, batch_size=None):
+            if not _audits_bulk(self):
+                return original_bulk_update(self, objs, fields, batch_size)
+            objs = list(objs)
+            with (
+                transaction.atomic(using=self.db, savepoint=False),
+                bulk.update_audited_by_caller(),
+            ):
+                before = bulk.fetch_pre_images(self, objs, batch_size)
+                rows = original_bulk_update(self, objs, fields, batch_size)
+                bulk.audit_bulk_update(self.model, objs, fields, before)
+            return rows
+
+        def update_with_audit(self, **kwargs):
+            if not _audits_bulk(self) or not bulk.audits_queryset_update():
+                return original_update(self, **kwargs)
+            return bulk.audited_update(self, original_update, kwargs)
+
+        QuerySet.bulk_create = bulk_create_with_audit
+        QuerySet.bulk_update = bulk_update_with_audit
+        QuerySet.update = update_with_audit
+
+    def _setup_delete_auditing(self):
+        """
+        Wrap Collector.delete() so the delete rows of everything it deletes,
+        cascades included, are recorded in batches with a shared group id
+        instead of one by one from pre_delete.
+        """
+        from django.db import transaction
+        from django.db.models.deletion import Collector
+
+        from awesome_audit_log import bulk
+
+        original_delete = Collector.delete
+
+        def delete_with_audit(self):
+            if not bulk.collects_audited(self):
+                # keep Django's fast delete path, without a transaction
+                return original_delete(self)
+            with transaction.atomic(using=self.using, savepoint=False):
+                bulk.audit_collected_deletes(self)
+                return original_delete(self)
+
+        Collector.delete = delete_with_audit
+
     def _setup_celery_auditing(self):
         """
         Wrap Celery's task execution to capture context using signals.
         Signals are only fired in worker processes, not when calling task.run() directly.
         """
+        if hasattr(self, "_celery_handlers"):
+            return
         try:
             from celery import signals
         except ImportError:
@@ -159,6 +280,38 @@ class AwesomeAuditLogConfig(AppConfig):
 
         self._celery_handlers = (task_prerun_handler, task_postrun_handler)
 
+    def _setup_celery_writer_flush(self):
+        """
+        Write the rows queued for the background writer when a Celery worker
+        process ends: pool processes exit without running atexit handlers.
+        """
+        try:
+            from celery import signals
+        except ImportError:
+            return
+
+        from awesome_audit_log.writer import flush_background_writer
+
+        def worker_process_shutdown_handler(**kwargs):
+            flush_background_writer()
+
+        signals.worker_process_shutdown.connect(
+            worker_process_shutdown_handler,
+            weak=False,
+            dispatch_uid="awesome_audit_log.flush_background_writer",
+        )
+
+
+def _uses_celery() -> bool:
+    """
+    Whether this process uses Celery: projects load their Celery app before
+    Django's apps are ready (from the project package), so Celery isn't
+    imported just to hook its task signals in processes that don't use it.
+    """
+    return "celery" in sys.modules or (
+        bool(get_setting("ASYNC")) and get_setting("ASYNC_MODE") == "celery"
+    )
+
 
 class ImproperlyConfiguredAuditDB(Exception):
     pass
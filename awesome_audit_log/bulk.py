@@ -0,0 +1,407 @@
+"""
+Auditing of operations that touch many rows at once: QuerySet bulk
+operations, which don't send model signals, and collected (cascading) deletes.
+"""
+
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from django.db import models, transaction
+from django.db.models import F, TextField, Value
+from django.db.models.functions import Cast, JSONObject
+
+from awesome_audit_log.conf import get_setting
+from awesome_audit_log.db import get_audit_database_manager
+from awesome_audit_log.plans import get_audit_plan
+from awesome_audit_log.signals import (
+    DELETE_GROUP_ATTR,
+    SAMPLED_OUT,
+    SUMMARIZED,
+    _complete_request_data,
+    _insert_audit_logs,
+    delete_payload,
+    sample_rate,
+)
+from awesome_audit_log.storm import summarize_event
+from awesome_audit_log.utils import (
+    diff_dicts,
+    dumps,
+    row_to_dict,
+    serialize_instance,
+    serialize_values,
+)
+
+
+def audit_bulk_create(
+    model: type[models.Model],
+    objs: list[models.Model],
+    conflicting: "ConflictingRows | None" = None,
+    update_fields: list[str] | None = None,
+) -> None:
+    """
+    Record an insert row for every object saved by ``bulk_create()``. With
+    ``update_conflicts``, objects matching one of the ``conflicting`` rows
+    updated it instead, and get an update row limited to ``update_fields``.
+    """
+    if not objs:
+        return
+    plan = get_audit_plan(model)
+    converters = dict(zip(plan.attnames, plan.converters, strict=True))
+    attnames = _updated_attnames(model, update_fields or (), converters)
+    created_at = datetime.now(timezone.utc).isoformat()
+    payloads = []
+    for obj in objs:
+        existing = None if conflicting is None else conflicting.match(obj)
+        if existing is None:
+            after = serialize_instance(obj)
+            payloads.append(_payload("insert", obj.pk, None, after, created_at))
+            continue
+        pk, old = existing
+        payload = _update_payload(plan, pk, old, obj, attnames, converters, created_at)
+        if payload is not None:
+            payloads.append(payload)
+    _insert_audit_logs(model, payloads)
+
+
+class ConflictingRows:
+    """
+    Rows that ``bulk_create(update_conflicts=True)`` may update instead of
+    inserting an object: those matching an object on ``unique_fields``, or on
+    any unique constraint of the model when they aren't given (MySQL).
+    """
+
+    def __init__(self, model: type[models.Model], unique_fields):
+        opts = model._meta
+        if unique_fields:
+            names = [opts.pk.name if name == "pk" else name for name in unique_fields]
+            keys = [tuple(opts.get_field(name).attname for name in names)]
+        else:
+            keys = [(field.attname,) for field in opts.concrete_fields if field.unique]
+            keys += [
+                tuple(opts.get_field(name).attname for name in fields)
+                for fields in (
+                    *opts.unique_together,
+                    *(
+                        constraint.fields
+                        for constraint in opts.total_unique_constraints
+                    ),
+                )
+            ]
+        self.keys = list(dict.fromkeys(keys))
+        # (key, values) -> (pk, serialized row)
+        self.rows: dict[tuple, tuple] = {}
+
+    def fetch(self, queryset: models.QuerySet, objs: list, batch_size) -> None:
+        """Load the matching rows, with one query per batch of objects."""
+        plan = get_audit_plan(queryset.model)
+        columns = dict.fromkeys(
+            (*plan.attnames, *(a for key in self.keys for a in key))
+        )
+        batch_size = batch_size or get_setting("BATCH_SIZE")
+        for start in range(0, len(objs), batch_size):
+            condition = models.Q()
+            for obj in objs[start : start + batch_size]:
+                for key in self.keys:
+                    values = self._values(obj, key)
+                    if values is not None:
+                        condition |= models.Q(**dict(zip(key, values, strict=True)))
+            if not condition:
+                continue
+            for row in queryset.filter(condition).values("pk", *columns):
+                image = row_to_dict(plan, serialize_values(plan, row))
+                for key in self.keys:
+                    values = tuple(row[name] for name in key)
+                    self.rows[(key, values)] = (row["pk"], image)
+
+    def match(self, obj: models.Model) -> tuple | None:
+        """Return the pk and row ``obj`` was matched with, if any."""
+        for key in self.keys:
+            values = self._values(obj, key)
+            existing = self.rows.get((key, values))
+            if values is not None and existing is not None:
+                return existing
+        return None
+
+    @staticmethod
+    def _values(obj, key) -> tuple | None:
+        values = tuple(getattr(obj, name) for name in key)
+        return None if None in values else values
+
+
+def fetch_pre_images(
+    queryset: models.QuerySet, objs: list[models.Model], batch_size: int | None
+) -> dict:
+    """
+    Load the current rows of the objects passed to ``bulk_update()``, with one
+    ``pk__in`` query per batch. Returns the serialized rows by pk.
+    """
+    plan = get_audit_plan(queryset.model)
+    pks = [obj.pk for obj in objs if obj.pk is not None]
+    batch_size = batch_size or get_setting("BATCH_SIZE")
+    before = {}
+    for start in range(0, len(pks), batch_size):
+        rows = queryset.filter(pk__in=pks[start : start + batch_size]).values(
+            "pk", *plan.attnames
+        )
+        for row in rows:
+            before[row["pk"]] = row_to_dict(plan, serialize_values(plan, row))
+    return before
+
+
+def audit_bulk_update(
+    model: type[models.Model],
+    objs: list[models.Model],
+    fields: list[str],
+    before: dict,
+) -> None:
+    """
+    Record an update row for every object updated by ``bulk_update()``. Only
+    ``fields`` are written by it, so the after image is the pre-image with
+    those fields taken from the object.
+    """
+    plan = get_audit_plan(model)
+    converters = dict(zip(plan.attnames, plan.converters, strict=True))
+    attnames = _updated_attnames(model, fields, converters)
+    created_at = datetime.now(timezone.utc).isoformat()
+    payloads = []
+    for obj in objs:
+        old = before.get(obj.pk)
+        if old is None:
+            continue
+        payload = _update_payload(
+            plan, obj.pk, old, obj, attnames, converters, created_at
+        )
+        if payload is not None:
+            payloads.append(payload)
+    _insert_audit_logs(model, payloads)
+
+
+def _updated_attnames(model, fields, converters) -> list[str]:
+    attnames = [model._meta.get_field(name).attname for name in fields]
+    return [name for name in attnames if name in converters]
+
+
+def _update_payload(plan, pk, old, obj, attnames, converters, created_at):
+    """
+    Build the update row of ``obj`` whose ``attnames`` were written over the
+    row ``old``, None when it changes nothing that is recorded.
+    """
+    after = {
+        **old,
+        **{name: converters[name](getattr(obj, name)) for name in attnames},
+    }
+    changes = diff_dicts(old, after)
+    if plan.is_noop_update(changes):
+        return None
+    return _payload("update", pk, old, after, created_at, changes)
+
+
+# set while an operation that records its own rows (bulk_update) runs
+# QuerySet.update() internally
+_update_audited_by_caller: ContextVar[bool] = ContextVar(
+    "awesome_audit_log_update_audited_by_caller", default=False
+)
+
+
+@contextmanager
+def update_audited_by_caller():
+    token = _update_audited_by_caller.set(True)
+    try:
+        yield
+    finally:
+        _update_audited_by_caller.reset(token)
+
+
+def audits_queryset_update() -> bool:
+    return not _update_audited_by_caller.get()
+
+
+def audited_update(queryset: models.QuerySet, update, kwargs: dict) -> int:
+    """
+    Run ``update(queryset, **kwargs)`` (the original ``QuerySet.update``)
+    and record an update row per matched object.
+
+    When the log table lives in the database of the queryset, the rows are
+    built by the database itself with a single ``INSERT ... SELECT``, run in
+    the same transaction right before the update, so nothing is loaded into
+    Python. The JSON values are then rendered by the database's JSON object
+    function (``jsonb_build_object``/``JSON_OBJECT``/``json_object``), and
+    ``changes`` lists every updated field. Like any bulk operation, these rows
+    aren't sampled nor counted in audit storms, and being written with the
+    update they skip the transaction buffer, SKIP_NOOP_UPDATES and
+    ASYNC_MODE.
+    """
+    plan = get_audit_plan(queryset.model)
+    updated = {queryset.model._meta.get_field(name).attname for name in kwargs}
+    if not updated.intersection(plan.attnames):
+        # none of the updated fields is audited
+        return update(queryset, **kwargs)
+
+    manager = get_audit_database_manager()
+    connection = manager._get_connection()
+    if connection is None:
+        return update(queryset, **kwargs)
+
+    if (
+        connection.alias != queryset.db
+        or not connection.features.has_json_object_function
+    ):
+        return _audited_update_in_python(queryset, update, kwargs)
+    if not manager._prepare_connection(connection):
+        # a new connection opened in a transaction: the log table may live
+        # in a database not attached yet
+        return _audited_update_in_python(queryset, update, kwargs)
+
+    log_table = manager.known_log_table(queryset.model)
+    if log_table is None:
+        if connection.in_atomic_block:
+            # creating or altering the log table would run DDL in the
+            # caller's transaction
+            return _audited_update_in_python(queryset, update, kwargs)
+        log_table = manager.ensure_log_table_for_model_exist(queryset.model)
+    sql, params = _insert_select_sql(
+        queryset, kwargs, manager._get_vendor_for_connection(), log_table
+    )
+    with transaction.atomic(using=queryset.db, savepoint=False):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+        return update(queryset, **kwargs)
+
+
+def _insert_select_sql(queryset, kwargs, vendor, log_table) -> tuple[str, tuple]:
+    model = queryset.model
+    plan = get_audit_plan(model)
+    new_values = {}
+    for name, value in kwargs.items():
+        field = model._meta.get_field(name)
+        if field.attname not in plan.attnames:
+            continue
+        if hasattr(value, "resolve_expression"):
+            new_values[field.attname] = value
+        elif isinstance(value, models.Model):
+            new_values[field.attname] = Value(value.pk, output_field=field.target_field)
+        else:
+            new_values[field.attname] = Value(value, output_field=field)
+
+    query = queryset.query
+    if query.annotations or query.distinct or len(query.alias_map) > 1:
+        # joins could return a row more than once, select the rows by pk
+        queryset = model._base_manager.using(queryset.db).filter(
+            pk__in=queryset.values("pk")
+        )
+    rows = queryset.order_by().values_list(
+        Cast("pk", output_field=TextField()),
+        JSONObject(**{name: F(name) for name in plan.attnames}),
+        JSONObject(**{name: new_values.get(name, F(name)) for name in plan.attnames}),
+        JSONObject(
+            **{
+                name: JSONObject(**{"from": F(name), "to": value})
+                for name, value in new_values.items()
+            }
+        ),
+    )
+    select_sql, select_params = rows.query.get_compiler(using=queryset.db).as_sql()
+
+    row_cols = ("object_pk", "before", "after", "changes")
+    constants = _complete_request_data(
+        {
+            "action": "update",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+    )
+    const_cols = [c for c in get_audit_database_manager().COLUMNS if c not in row_cols]
+    cols = ",".join(vendor.parse_table_strings(c) for c in (*row_cols, *const_cols))
+    placeholders = ",".join(["%s"] * len(const_cols))
+    sql = (
+        f"INSERT INTO {vendor.get_full_table_name(log_table)} ({cols}) "
+        f"SELECT audit_rows.*, {placeholders} FROM ({select_sql}) audit_rows"
+    )
+    return sql, (*(constants.get(c) for c in const_cols), *select_params)
+
+
+def _audited_update_in_python(queryset, update, kwargs) -> int:
+    """
+    Fallback of ``audited_update`` for log tables in another database, or
+    not known to exist yet within a transaction: the rows are loaded before
+    and after the update and diffed in Python.
+    """
+    model = queryset.model
+    plan = get_audit_plan(model)
+    with transaction.atomic(using=queryset.db, savepoint=False):
+        before = {
+            row["pk"]: row_to_dict(plan, serialize_values(plan, row))
+            for row in queryset.values("pk", *plan.attnames).iterator()
+        }
+        rows = update(queryset, **kwargs)
+        after_qs = model._base_manager.using(queryset.db)
+        pks = list(before)
+        batch_size = get_setting("BATCH_SIZE")
+        created_at = datetime.now(timezone.utc).isoformat()
+        for start in range(0, len(pks), batch_size):
+            payloads = []
+            batch = after_qs.filter(pk__in=pks[start : start + batch_size])
+            for row in batch.values("pk", *plan.attnames):
+                pk = row["pk"]
+                after = row_to_dict(plan, serialize_values(plan, row))
+                changes = diff_dicts(before[pk], after)
+                if plan.is_noop_update(changes):
+                    continue
+                payloads.append(
+                    _payload("update", pk, before[pk], after, created_at, changes)
+                )
+            _insert_audit_logs(model, payloads)
+    return rows
+
+
+def collects_audited(collector) -> bool:
+    """Whether a deletion ``Collector`` is about to delete audited objects."""
+    return any(
+        not model._meta.auto_created and get_audit_plan(model).audited
+        for model in collector.data
+    )
+
+
+def audit_collected_deletes(collector) -> None:
+    """
+    Record the delete rows of everything a deletion ``Collector`` is about to
+    delete, per model in batches, tagged with one shared ``group_id``. The
+    instances are marked so the per-object pre_delete handler skips them.
+    """
+    group_id = uuid.uuid4().hex
+    created_at = datetime.now(timezone.utc).isoformat()
+    for model, instances in collector.data.items():
+        plan = get_audit_plan(model)
+        if model._meta.auto_created or not plan.audited:
+            continue
+        payloads = []
+        for obj in instances:
+            setattr(obj, DELETE_GROUP_ATTR, group_id)
+            rate = sample_rate(plan)
+            if rate is SAMPLED_OUT:
+                continue
+            if rate is SUMMARIZED:
+                summarize_event(model, "delete", obj.pk, using=collector.using)
+                continue
+            payload = delete_payload(plan, obj, created_at, rate)
+            payload["group_id"] = group_id
+            payloads.append(payload)
+        _insert_audit_logs(model, payloads)
+
+
+def _payload(
+    action: str, pk, before, after, created_at: str, changes: dict | None = None
+) -> dict:
+    if changes is None:
+        changes = diff_dicts(before, after)
+    return _complete_request_data(
+        {
+            "action": action,
+            "object_pk": str(pk),
+            "before": dumps(before),
+            "after": dumps(after),
+            "changes": dumps(changes),
+            "created_at": created_at,
+        }
+    )
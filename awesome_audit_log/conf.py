@@ -5,8 +5,35 @@ DEFAULTS = {
     "DATABASE_ALIAS": "default",
     # PostgreSQL schema for audit tables (defaults to 'public')
     "PG_SCHEMA": None,
+    # write batches of audit rows to PostgreSQL with COPY instead of INSERT
+    # (requires psycopg 3)
+    "PG_COPY": False,
+    # load MySQL batches of at least this many rows with LOAD DATA LOCAL INFILE
+    # (requires local_infile on the client and the server); None to always
+    # use multi-value INSERTs
+    "MYSQL_LOAD_DATA_THRESHOLD": None,
+    # file attached to the SQLite audit connection to hold the log tables,
+    # instead of the database of the connection itself
+    "SQLITE_ATTACH": None,
+    # tune the SQLite audit database for concurrent writers: WAL journal,
+    # synchronous=NORMAL, SQLITE_BUSY_TIMEOUT and one transaction per flush
+    "SQLITE_WAL": False,
+    # milliseconds a SQLite audit write waits for the write lock
+    "SQLITE_BUSY_TIMEOUT": 5000,
     # Enable async logging with Celery (requires Celery to be installed and configured)
     "ASYNC": False,
+    # how rows are written with ASYNC on: "celery", "thread" for a background
+    # writer thread of the process (no Celery needed), or "asyncio" for a
+    # writer task of the event loop serving the ASGI request
+    "ASYNC_MODE": "celery",
+    # rows the writer queue holds, and what to do when it's full:
+    # "block" the caller, "drop" the row or write it synchronously ("sync")
+    "ASYNC_QUEUE_SIZE": 10000,
+    "ASYNC_QUEUE_FULL": "block",
+    # rows written per batch by the writer, and seconds it waits for
+    # a batch to fill
+    "ASYNC_BATCH_SIZE": 500,
+    "ASYNC_FLUSH_INTERVAL": 1.0,
     # "all" or list like ["app_label.ModelA", "app.ModelB"]
     "AUDIT_MODELS": "all",
     # like AUDIT_MODELS but for opt-out, useful when AUDIT_MODELS set to all
@@ -22,6 +49,40 @@ DEFAULTS = {
     # if audit alias missing/unavailable, use 'default' intentionally,
     # this requires RAISE_ERROR_IF_DB_UNAVAILABLE is set to False
     "FALLBACK_TO_DEFAULT": False,
+    # keep the field values of instances loaded from the database so the
+    # "before" image of an update is built from memory instead of a SELECT
+    "TRACK_LOADED_STATE": False,
+    # audit rows captured inside a transaction are written on commit,
+    # grouped per log table with at most this many rows per statement
+    "BATCH_SIZE": 500,
+    # audit QuerySet.bulk_create() and bulk_update(), which don't send
+    # pre_save/post_save
+    "CAPTURE_BULK_OPERATIONS": False,
+    # JSON encoder for the before/after/changes columns: "json", "orjson",
+    # "msgspec", or "auto" for the fastest one installed
+    "ENCODER": "auto",
+    # don't record updates that change nothing, or only auto_now fields
+    "SKIP_NOOP_UPDATES": False,
+    # record one row per object and transaction: the first "before", the last
+    # "after", and no row at all for objects inserted and deleted in it
+    "COALESCE_TRANSACTION_ROWS": False,
+    # share of the save/delete events recorded (0 to 1), the rate is stored
+    # in the sample_rate column of sampled rows
+    "SAMPLE_RATE": 1.0,
+    # at most this many save/delete rows per second and model (token bucket),
+    # or {"rate": ..., "burst": ...}; None for no limit
+    "RATE_LIMIT": None,
+    # merge the updates of an object made within this many seconds into one
+    # row, written by a background thread once the window is over, or
+    # {"seconds": ..., "fields": [...]} to only debounce updates of these fields
+    "DEBOUNCE": None,
+    # per model overrides of the options above, keyed by "app_label.model_name",
+    # e.g. {"shop.order": {"SKIP_NOOP_UPDATES": True}}, which also accept
+    # "FIELDS" / "EXCLUDE_FIELDS" lists to limit the audited fields of the model
+    "MODEL_OPTIONS": {},
+    # past this many save/delete events in one request, command or task, the
+    # next ones are only counted in one "summary" row per model; None for no limit
+    "STORM_THRESHOLD": None,
 }
 
 
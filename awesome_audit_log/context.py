@@ -1,5 +1,9 @@
 from contextvars import ContextVar
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from awesome_audit_log.storm import AuditStorm
 
 
 @dataclass
@@ -12,6 +16,8 @@ class RequestContext:
     user_id: int | None = None
     user_name: str | None = None
     user_agent: str | None = None
+    # audited events of the context, see storm.py
+    audit_storm: "AuditStorm | None" = field(default=None, compare=False, repr=False)
 
 _ctx: ContextVar[RequestContext | None] = ContextVar(
     'awesome_audit_log_ctx',
@@ -22,7 +28,12 @@ def set_request_ctx(ctx: RequestContext):
     _ctx.set(ctx)
 
 def clear_request_ctx():
-    _ctx.set(None)
+    ctx = _ctx.get()
+    try:
+        if ctx is not None and ctx.audit_storm is not None:
+            ctx.audit_storm.flush()
+    finally:
+        _ctx.set(None)
 
 def get_request_ctx(default: RequestContext | None = None) -> RequestContext | None:
     try:
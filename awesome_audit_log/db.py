@@ -1,10 +1,21 @@
 import logging
+import tempfile
+import threading
 from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from functools import partial
 
+from django.core.signals import setting_changed
 from django.db import connections, models, transaction
-from django.db.utils import ConnectionDoesNotExist, OperationalError
+from django.db.utils import ConnectionDoesNotExist, DatabaseError, OperationalError
+from django.dispatch import receiver
 
+from awesome_audit_log.aio import get_asyncio_writer
 from awesome_audit_log.conf import get_setting
+from awesome_audit_log.debounce import get_debouncer
+from awesome_audit_log.plans import get_audit_plan
+from awesome_audit_log.utils import resolve_payload
+from awesome_audit_log.writer import get_background_writer, uses_background_writer
 
 logger = logging.getLogger(__name__)
 
@@ -31,10 +42,50 @@ class AbstractDatabaseVendor(ABC):
         """Return a SQL statement to create a new table."""
         pass
 
+    @abstractmethod
+    def get_columns_query(self, table_name: str) -> tuple[str, tuple]:
+        """Return a SQL statement listing the column names of a table."""
+        pass
+
+    @abstractmethod
+    def get_column_type(self, column: str) -> str:
+        """Return the type of a column added after the table layout was first
+        released (see ``AuditDatabaseManager.ADDED_COLUMNS``)."""
+        pass
+
+    def get_add_column_sql(self, table_name: str, column: str) -> str:
+        """Return a SQL statement adding one of the added columns to a table."""
+        t = self.parse_table_strings(table_name)
+        c = self.parse_table_strings(column)
+        return f"ALTER TABLE {t} ADD COLUMN {c} {self.get_column_type(column)}"
+
     def parse_table_strings(self, table_name: str) -> str:
         """Return database specific table/column name."""
         return table_name
 
+    def get_full_table_name(self, table_name: str) -> str:
+        """Return the table name to write to, schema included."""
+        return self.parse_table_strings(table_name)
+
+    def prepare_connection(self, connection) -> None:
+        """Set the audit connection up, once per database connection."""
+        pass
+
+    def transactional_flush(self) -> bool:
+        """Whether the rows of a flush are written in a single transaction."""
+        return False
+
+    def supports_bulk_write(self, connection) -> bool:
+        """Whether batches of rows are written with ``bulk_write_rows``."""
+        return False
+
+    def bulk_write_rows(self, connection, rows: list, table_name: str, columns: tuple):
+        """
+        Write a batch of rows through a vendor specific bulk path, split into
+        as many statements as the database needs.
+        """
+        raise NotImplementedError
+
 
 class PostgresDatabaseVendor(AbstractDatabaseVendor):
     def __init__(self, connection=None):
@@ -51,6 +102,11 @@ class PostgresDatabaseVendor(AbstractDatabaseVendor):
 
         return "public"
 
+    def get_full_table_name(self, table_name: str) -> str:
+        # Include schema in table name if not default
+        schema = self._get_schema()
+        return f"{schema}.{table_name}" if schema != "public" else table_name
+
     def get_table_exist_query(self, table_name: str) -> tuple[str, tuple]:
         schema = self._get_schema()
         query = """
@@ -63,9 +119,7 @@ class PostgresDatabaseVendor(AbstractDatabaseVendor):
 
     def get_create_table_sql(self, table_name: str) -> str:
         json_type = self._get_json_type()
-        schema = self._get_schema()
-        # Include schema in table name if not default
-        full_table_name = f"{schema}.{table_name}" if schema != "public" else table_name
+        full_table_name = self.get_full_table_name(table_name)
         create_sql = f"""
                    CREATE TABLE IF NOT EXISTS {full_table_name} (
                        id BIGSERIAL PRIMARY KEY,
@@ -82,15 +136,102 @@ class PostgresDatabaseVendor(AbstractDatabaseVendor):
                        user_id BIGINT,
                        user_name TEXT,
                        user_agent TEXT,
-                       created_at TIMESTAMPTZ NOT NULL
+                       created_at TIMESTAMPTZ NOT NULL,
+                       group_id {self.get_column_type("group_id")},
+                       sample_rate {self.get_column_type("sample_rate")}
                    );
                    """
         return create_sql
 
+    def get_columns_query(self, table_name: str) -> tuple[str, tuple]:
+        query = """
+                SELECT column_name
+                FROM information_schema.columns
+                WHERE table_schema = %s
+                  AND table_name = %s;
+                """
+        return query, (self._get_schema(), table_name)
+
+    def get_column_type(self, column: str) -> str:
+        return {"group_id": "VARCHAR(32)", "sample_rate": "DOUBLE PRECISION"}[column]
+
+    def get_add_column_sql(self, table_name: str, column: str) -> str:
+        return super().get_add_column_sql(self.get_full_table_name(table_name), column)
+
+    def supports_bulk_write(self, connection) -> bool:
+        if not get_setting("PG_COPY"):
+            return False
+        from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+        return is_psycopg3
+
+    def bulk_write_rows(self, connection, rows: list, table_name: str, columns: tuple):
+        """
+        Write rows with COPY FROM STDIN (psycopg 3), in text format: the JSON
+        columns are sent as JSON text, which PostgreSQL parses into JSONB.
+        """
+        sql = (
+            f"COPY {self.get_full_table_name(table_name)} "
+            f"({', '.join(columns)}) FROM STDIN"
+        )
+        with connection.cursor() as cursor, connection.wrap_database_errors:
+            with cursor.cursor.copy(sql) as copy:
+                for row in rows:
+                    copy.write_row(row)
+
+
+# bytes of a MySQL packet kept for the protocol and the statement itself
+MYSQL_PACKET_MARGIN = 1024
+
+
+def _chunks_under(rows: list, max_size: int):
+    """
+    Split rows into chunks whose escaped values fit in ``max_size`` bytes; a
+    row larger than that is sent alone.
+    """
+    chunk, size = [], 0
+    for row in rows:
+        row_size = _escaped_size(row)
+        if chunk and size + row_size > max_size:
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(row)
+        size += row_size
+    if chunk:
+        yield chunk
+
+
+def _escaped_size(row) -> int:
+    """Upper bound of the size of a row in a VALUES list, in bytes."""
+    size = 3
+    for value in row:
+        if isinstance(value, str):
+            # every byte may be escaped, plus the quotes and the comma
+            size += 2 * len(value.encode()) + 3
+        else:
+            size += 25
+    return size
+
+
+def _load_data_value(value) -> str:
+    """A value in the default LOAD DATA text format."""
+    if value is None:
+        return "\\N"
+    if not isinstance(value, str):
+        return str(value)
+    return (
+        value.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+        .replace("\0", "\\0")
+    )
+
 
 class MySQlDatabaseVendor(AbstractDatabaseVendor):
     def __init__(self, connection):
         self.connection = connection
+        self._max_allowed_packet: int | None = None
 
     def _get_json_type(self) -> str:
         return "JSON"
@@ -124,23 +265,100 @@ class MySQlDatabaseVendor(AbstractDatabaseVendor):
                        `user_id` BIGINT,
                        `user_name` TEXT,
                        `user_agent` TEXT,
-                       `created_at` TIMESTAMP NOT NULL
+                       `created_at` TIMESTAMP NOT NULL,
+                       `group_id` {self.get_column_type("group_id")},
+                       `sample_rate` {self.get_column_type("sample_rate")}
                    ) ENGINE=InnoDB;
                    """
         return create_sql
 
+    def get_columns_query(self, table_name: str) -> tuple[str, tuple]:
+        query = """
+                SELECT column_name
+                FROM information_schema.columns
+                WHERE table_schema = %s
+                  AND table_name = %s;
+                """
+        return query, (self.connection.settings_dict["NAME"], table_name)
+
+    def get_column_type(self, column: str) -> str:
+        return {"group_id": "VARCHAR(32)", "sample_rate": "DOUBLE"}[column]
+
     def parse_table_strings(self, table_name: str) -> str:
         return f"`{table_name}`"
 
+    def supports_bulk_write(self, connection) -> bool:
+        return True
+
+    def bulk_write_rows(self, connection, rows: list, table_name: str, columns: tuple):
+        """
+        Write rows with multi-value INSERTs kept under the max_allowed_packet
+        of the server, or with LOAD DATA LOCAL INFILE for batches of at least
+        MYSQL_LOAD_DATA_THRESHOLD rows.
+        """
+        table = self.parse_table_strings(table_name)
+        column_list = ",".join(self.parse_table_strings(c) for c in columns)
+        threshold = get_setting("MYSQL_LOAD_DATA_THRESHOLD")
+        if threshold is not None and len(rows) >= threshold:
+            self._load_data(connection, rows, table, column_list)
+            return
+        prefix = f"INSERT INTO {table} ({column_list}) VALUES "
+        values = f"({','.join(['%s'] * len(columns))})"
+        max_size = self._get_max_allowed_packet(connection) - len(prefix)
+        with connection.cursor() as cursor:
+            for chunk in _chunks_under(rows, max_size):
+                cursor.execute(
+                    prefix + ",".join([values] * len(chunk)),
+                    [value for row in chunk for value in row],
+                )
+
+    def _get_max_allowed_packet(self, connection) -> int:
+        """max_allowed_packet of the server, read once, minus a safety margin."""
+        if self._max_allowed_packet is None:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT @@max_allowed_packet")
+                self._max_allowed_packet = int(cursor.fetchone()[0])
+        return self._max_allowed_packet - MYSQL_PACKET_MARGIN
+
+    @staticmethod
+    def _load_data(connection, rows, table, column_list):
+        # drivers only read LOCAL INFILE data from a file name, so the rows
+        # built in memory are spooled to a temporary file
+        data = "".join(
+            "\t".join(_load_data_value(value) for value in row) + "\n" for row in rows
+        )
+        with tempfile.NamedTemporaryFile(suffix=".tsv") as file:
+            file.write(data.encode())
+            file.flush()
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} "
+                    "CHARACTER SET utf8mb4 "
+                    "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+                    f"LINES TERMINATED BY '\\n' ({column_list})",
+                    [file.name],
+                )
+
 
 class SQLiteDatabaseVendor(AbstractDatabaseVendor):
+    # name of the database attached with SQLITE_ATTACH
+    ATTACHED_SCHEMA = "audit_log"
+
     def _get_json_type(self) -> str:
         return "TEXT"
 
+    def _get_schema(self) -> str:
+        """The attached audit database, or the main one."""
+        return self.ATTACHED_SCHEMA if get_setting("SQLITE_ATTACH") else "main"
+
+    def get_full_table_name(self, table_name: str) -> str:
+        schema = self._get_schema()
+        return f"{schema}.{table_name}" if schema != "main" else table_name
+
     def get_table_exist_query(self, table_name: str) -> tuple[str, tuple]:
-        query = """
+        query = f"""
                 SELECT EXISTS (SELECT 1 \
-                               FROM sqlite_master \
+                               FROM {self._get_schema()}.sqlite_master \
                                WHERE type = 'table' \
                                  AND name = %s); \
                 """
@@ -149,8 +367,9 @@ class SQLiteDatabaseVendor(AbstractDatabaseVendor):
 
     def get_create_table_sql(self, table_name: str) -> str:
         json_type = self._get_json_type()
+        full_table_name = self.get_full_table_name(table_name)
         create_sql = f"""
-                   CREATE TABLE IF NOT EXISTS {table_name} (
+                   CREATE TABLE IF NOT EXISTS {full_table_name} (
                        id INTEGER PRIMARY KEY AUTOINCREMENT,
                        action TEXT NOT NULL,
                        object_pk TEXT NOT NULL,
@@ -165,16 +384,119 @@ class SQLiteDatabaseVendor(AbstractDatabaseVendor):
                        user_id INTEGER,
                        user_name TEXT,
                        user_agent TEXT,
-                       created_at TEXT NOT NULL
+                       created_at TEXT NOT NULL,
+                       group_id {self.get_column_type("group_id")},
+                       sample_rate {self.get_column_type("sample_rate")}
                    );
                    """
         return create_sql
 
+    def get_columns_query(self, table_name: str) -> tuple[str, tuple]:
+        return (
+            "SELECT name FROM pragma_table_info(%s, %s);",
+            (table_name, self._get_schema()),
+        )
+
+    def get_column_type(self, column: str) -> str:
+        return {"group_id": "TEXT", "sample_rate": "REAL"}[column]
+
+    def get_add_column_sql(self, table_name: str, column: str) -> str:
+        return super().get_add_column_sql(self.get_full_table_name(table_name), column)
+
+    def prepare_connection(self, connection) -> None:
+        """
+        Attach the SQLITE_ATTACH database and, with SQLITE_WAL, switch the
+        audit database to WAL with synchronous=NORMAL and set a busy timeout,
+        so audit writes wait for the write lock instead of failing.
+        """
+        schema = self._get_schema()
+        with connection.cursor() as cursor:
+            if schema != "main":
+                cursor.execute(
+                    "SELECT 1 FROM pragma_database_list WHERE name = %s", (schema,)
+                )
+                if cursor.fetchone() is None:
+                    cursor.execute(
+                        f"ATTACH DATABASE %s AS {schema}",
+                        (str(get_setting("SQLITE_ATTACH")),),
+                    )
+            if get_setting("SQLITE_WAL"):
+                cursor.execute(f"PRAGMA {schema}.journal_mode=WAL")
+                cursor.execute(f"PRAGMA {schema}.synchronous=NORMAL")
+                timeout = int(get_setting("SQLITE_BUSY_TIMEOUT"))
+                cursor.execute(f"PRAGMA busy_timeout={timeout}")
+
+    def transactional_flush(self) -> bool:
+        return bool(get_setting("SQLITE_WAL"))
+
 
 class AuditDatabaseManager:
+    """
+    Writes audit rows to the audit database.
+
+    A single manager is shared by the whole process (see
+    ``get_audit_database_manager``). It remembers the log tables it already
+    verified or created, the vendor of each connection and the INSERT
+    statement of each log table, so an audit write is a single round trip.
+    Django connections are per thread, so the resolved connection is kept in
+    thread-local storage while the caches are shared between threads.
+    """
+
+    COLUMNS = (
+        "action",
+        "object_pk",
+        "before",
+        "after",
+        "changes",
+        "entry_point",
+        "route",
+        "path",
+        "method",
+        "ip",
+        "user_id",
+        "user_name",
+        "user_agent",
+        "created_at",
+        "group_id",
+        "sample_rate",
+    )
+
+    # columns added after the first release of the log table layout, added
+    # to existing log tables the first time they are used
+    ADDED_COLUMNS = ("group_id", "sample_rate")
+
     def __init__(self):
-        self._connection = None
-        self._vendor = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # alias -> vendor
+        self._vendors: dict[str, AbstractDatabaseVendor] = {}
+        # (alias, log table) of the log tables known to exist
+        self._known_tables: set[tuple[str, str]] = set()
+        # (alias, log table) -> INSERT statement
+        self._insert_sql: dict[tuple[str, str], str] = {}
+
+    @property
+    def _connection(self):
+        return getattr(self._local, "connection", None)
+
+    @_connection.setter
+    def _connection(self, connection):
+        self._local.connection = connection
+        self._local.alias = None
+
+    @property
+    def _vendor(self):
+        if self._connection is None:
+            return None
+        return self._get_vendor_for_connection()
+
+    def reset(self):
+        """Forget every cached table, vendor and statement."""
+        with self._lock:
+            self._vendors.clear()
+            self._known_tables.clear()
+            self._insert_sql.clear()
+        self._local = threading.local()
 
     def _table_exists(self, table_name: str) -> bool:
         query, params = self._vendor.get_table_exist_query(table_name)
@@ -189,7 +511,26 @@ class AuditDatabaseManager:
         with self._connection.cursor() as cursor:
             cursor.execute(create_sql)
 
+    def _add_missing_columns(self, log_table: str):
+        query, params = self._vendor.get_columns_query(log_table)
+
+        with self._connection.cursor() as cursor:
+            cursor.execute(query, params)
+            columns = {row[0].lower() for row in cursor.fetchall()}
+            for column in self.ADDED_COLUMNS:
+                if column not in columns:
+                    cursor.execute(self._vendor.get_add_column_sql(log_table, column))
+
     def _get_vendor_for_connection(self):
+        alias = self._connection.alias
+        vendor = self._vendors.get(alias)
+        if vendor is None:
+            vendor = self._build_vendor()
+            with self._lock:
+                self._vendors[alias] = vendor
+        return vendor
+
+    def _build_vendor(self):
         vendor_map = {
             "postgresql": lambda: PostgresDatabaseVendor(self._connection),
             "mysql": lambda: MySQlDatabaseVendor(self._connection),
@@ -201,7 +542,7 @@ class AuditDatabaseManager:
 
     def _get_connection(self):
         alias = get_setting("DATABASE_ALIAS")
-        if self._connection is not None:
+        if self._connection is not None and self._local.alias == alias:
             return self._connection
 
         try:
@@ -216,11 +557,13 @@ class AuditDatabaseManager:
                 logger.warning("Audit db is not available", exc_info=True)
                 return None
 
+        # the connection is only probed the first time this thread uses it,
+        # later failures surface from the INSERT itself
         if not self._test_connection(connection):
             return None
 
         self._connection = connection
-        self._vendor = self._get_vendor_for_connection()
+        self._local.alias = alias
         return connection
 
     def _test_connection(self, connection) -> bool:
@@ -256,64 +599,353 @@ class AuditDatabaseManager:
         if not connection:
             return None
 
-        base_table = model._meta.db_table
-        log_table = f"{base_table}_log"
-
-        # Check if table already exists
-        if self._table_exists(log_table):
+        self._prepare_connection(connection)
+        log_table = get_audit_plan(model).log_table
+        key = (connection.alias, log_table)
+        if key in self._known_tables:
             return log_table
 
-        # Create log table if not exists
-        self._create_log_table(log_table)
+        # Check if table already exists, create log table if not
+        if not self._table_exists(log_table):
+            self._create_log_table(log_table)
+        else:
+            self._add_missing_columns(log_table)
 
+        with self._lock:
+            self._known_tables.add(key)
         return log_table
 
-    def insert_log_row(self, model: models.Model, payload: dict):
+    def known_log_table(self, model: models.Model) -> str | None:
+        """
+        Return the log table of ``model`` when it's known to exist and be up
+        to date, without querying the database.
+        """
         connection = self._get_connection()
-        if not connection:
-            return
+        log_table = get_audit_plan(model).log_table
+        if not connection or (connection.alias, log_table) not in self._known_tables:
+            return None
+        return log_table
 
-        log_table = self._vendor.parse_table_strings(
-            self.ensure_log_table_for_model_exist(model)
-        )
+    def _prepare_connection(self, connection) -> bool:
+        """
+        Let the vendor set up each new database connection of this thread,
+        outside of a transaction (SQLite can't ATTACH or change its journal
+        mode within one). Return whether the connection is set up.
+        """
+        connection.ensure_connection()
+        if getattr(self._local, "prepared", None) is connection.connection:
+            return True
+        if connection.in_atomic_block:
+            return False
+        self._get_vendor_for_connection().prepare_connection(connection)
+        self._local.prepared = connection.connection
+        return True
+
+    def flush_transaction(self):
+        """
+        Return the context in which the rows of one flush are written: a
+        single transaction when the vendor asks for it.
+        """
+        connection = self._get_connection()
+        if (
+            not connection
+            or not self._get_vendor_for_connection().transactional_flush()
+        ):
+            return nullcontext()
+        self._prepare_connection(connection)
+        return transaction.atomic(using=connection.alias, savepoint=False)
+
+    def _forget_log_table(self, connection, log_table: str) -> bool:
+        """Drop a log table from the cache, returns whether it was cached."""
+        key = (connection.alias, log_table)
+        with self._lock:
+            if key not in self._known_tables:
+                return False
+            self._known_tables.discard(key)
+            return True
 
-        if not log_table:
-            logger.warning(f"log_table {log_table} does not exist")
+    def _get_insert_sql(self, connection, log_table: str) -> str:
+        key = (connection.alias, log_table)
+        sql = self._insert_sql.get(key)
+        if sql is None:
+            vendor = self._get_vendor_for_connection()
+            parsed_cols = [vendor.parse_table_strings(name) for name in self.COLUMNS]
+            placeholders = ",".join(["%s"] * len(self.COLUMNS))
+            sql = (
+                f"INSERT INTO {vendor.get_full_table_name(log_table)} "
+                f"({','.join(parsed_cols)}) VALUES ({placeholders})"
+            )
+            with self._lock:
+                self._insert_sql[key] = sql
+        return sql
+
+    def insert_log_row(self, model: models.Model, payload: dict, using=None):
+        self.insert_log_rows(model, [payload], using=using)
+
+    def insert_log_rows(self, model: models.Model, payloads: list[dict], using=None):
+        """
+        Write audit rows for ``model``. While the connection ``using`` is in
+        a transaction, the rows are buffered and written once it commits.
+        """
+        if not payloads:
             return
 
-        cols = [
-            "action",
-            "object_pk",
-            "before",
-            "after",
-            "changes",
-            "entry_point",
-            "route",
-            "path",
-            "method",
-            "ip",
-            "user_id",
-            "user_name",
-            "user_agent",
-            "created_at",
+        connection = self._get_connection()
+        if not connection:
+            return
+
+        # make sure we only write after the main tx commits
+        main_connection = transaction.get_connection(using)
+        if main_connection.in_atomic_block:
+            self._current_batch(main_connection).add(model, payloads)
+        elif not self._defer_write(model, payloads):
+            self.write_log_rows(model, payloads)
+
+    def _defer_write(self, model: models.Model, payloads: list[dict]) -> bool:
+        """
+        Hand rows to the writer of ASYNC_MODE "thread" or "asyncio", if any;
+        returns whether they were.
+        """
+        if uses_background_writer():
+            get_background_writer().put(model, payloads)
+            return True
+        writer = get_asyncio_writer()
+        return writer is not None and writer.put_threadsafe(model, payloads)
+
+    def buffer_debounced_row(self, model: models.Model, payload, using=None):
+        """
+        Buffer the update row of a debounced model made in the transaction of
+        the connection ``using``: it's handed to the debouncer once the
+        transaction commits, unless the object is deleted in it.
+        """
+        main_connection = transaction.get_connection(using)
+        self._current_batch(main_connection).add(model, [payload], debounced=True)
+
+    def flush_debounced_on_commit(
+        self, model: models.Model, object_pk: str, using=None
+    ):
+        """
+        Have the rows of an object deleted in the transaction of ``using``
+        that would be debounced written in place once it commits, after the
+        row still pending in the debouncer from earlier transactions.
+        """
+        main_connection = transaction.get_connection(using)
+        key = (model, object_pk)
+        batches = [
+            batch for batch in self._batches(main_connection) if batch.debounces(key)
+        ]
+        for batch in batches or [self._current_batch(main_connection)]:
+            batch.flushed.add(key)
+
+    def pending_payload(self, model: models.Model, object_pk: str, using=None):
+        """
+        Return the coalescable payload of the object buffered at the current
+        transaction (or savepoint) level of the connection ``using``, if any.
+        """
+        main_connection = transaction.get_connection(using)
+        if not main_connection.in_atomic_block:
+            return None
+        batch = self._find_batch(main_connection)
+        return batch.pending_payload(model, object_pk) if batch else None
+
+    def _current_batch(self, main_connection) -> "_AuditBatch":
+        """
+        Return the batch of the current transaction (or savepoint) level of
+        ``main_connection``, registering a new one if there is none yet.
+        """
+        batch = self._find_batch(main_connection)
+        if batch is None:
+            batch = _AuditBatch(self)
+            main_connection.on_commit(batch)
+        return batch
+
+    def _find_batch(self, main_connection) -> "_AuditBatch | None":
+        # only the last batch can take more rows: the rows of an earlier one
+        # at this level would be written before those of a savepoint since.
+        # atomic(savepoint=False) blocks push None: they roll back with their
+        # parent level, so they share its batch
+        savepoint_ids = set(main_connection.savepoint_ids) - {None}
+        for sids, callback, _robust in reversed(main_connection.run_on_commit):
+            if isinstance(callback, _AuditBatch) and callback.manager is self:
+                return callback if sids - {None} == savepoint_ids else None
+        return None
+
+    def _batches(self, main_connection) -> list["_AuditBatch"]:
+        """The batches of every level of the transaction of ``main_connection``."""
+        return [
+            callback
+            for _sids, callback, _robust in main_connection.run_on_commit
+            if isinstance(callback, _AuditBatch) and callback.manager is self
         ]
 
-        parsed_cols = [self._vendor.parse_table_strings(name) for name in cols]
+    def write_log_rows(self, model: models.Model, payloads: list[dict]):
+        """
+        Write audit rows right away, ``BATCH_SIZE`` rows per statement, or
+        through the bulk path of the vendor when it has one (see
+        ``AbstractDatabaseVendor.bulk_write_rows``).
+        """
+        connection = self._get_connection()
+        if not connection:
+            return
 
-        placeholders = ",".join(["%s"] * len(cols))
+        log_table = self.ensure_log_table_for_model_exist(model)
 
-        sql = (
-            f"INSERT INTO {log_table} ({','.join(parsed_cols)}) VALUES ({placeholders})"
-        )
+        if not log_table:
+            logger.warning(f"log_table {log_table} does not exist")
+            return
 
-        values = [payload.get(c) for c in cols]
+        rows = []
+        for payload in payloads:
+            payload = resolve_payload(payload)
+            if payload is not None:
+                rows.append([payload.get(c) for c in self.COLUMNS])
+        if not rows:
+            return
+        with self.flush_transaction():
+            self._write_rows(connection, model, log_table, rows)
+
+    def _write_rows(self, connection, model, log_table, rows):
+        vendor = self._get_vendor_for_connection()
+        if len(rows) > 1 and vendor.supports_bulk_write(connection):
+            # the vendor splits the batch itself
+            write = partial(
+                vendor.bulk_write_rows, table_name=log_table, columns=self.COLUMNS
+            )
+            batch_size = len(rows)
+        else:
+            write = partial(
+                self._insert, sql=self._get_insert_sql(connection, log_table)
+            )
+            batch_size = get_setting("BATCH_SIZE")
+        for start in range(0, len(rows), batch_size):
+            self._execute_insert(
+                connection, model, log_table, write, rows[start : start + batch_size]
+            )
+
+    def _execute_insert(self, connection, model, log_table, write, rows):
+        try:
+            write(connection, rows)
+        except DatabaseError:
+            # the cached log table may have been dropped in the meantime,
+            # check it again and retry once
+            if connection.in_atomic_block or not self._forget_log_table(
+                connection, log_table
+            ):
+                raise
+            self.ensure_log_table_for_model_exist(model)
+            write(connection, rows)
 
-        # make sure we only write after the main tx commits
-        def _do_insert():
-            with connection.cursor() as cursor:
-                cursor.execute(sql, values)
+    @staticmethod
+    def _insert(connection, rows, sql):
+        with connection.cursor() as cursor:
+            if len(rows) == 1:
+                cursor.execute(sql, rows[0])
+            else:
+                cursor.executemany(sql, rows)
+
+
+class _AuditBatch:
+    """
+    Audit rows captured at one transaction (or savepoint) level. The batch is
+    the on_commit callback itself, so Django discards it together with its
+    rows when that level is rolled back.
+
+    Payloads with a ``coalesce_key`` are merged with the earlier payload of
+    the same object at this level, which keeps its place in the batch.
+
+    Update rows of debounced models are handed to the debouncer instead of
+    being written, unless their object is in ``flushed`` (deleted in the
+    transaction): its rows are then written in place, after the row pending
+    in the debouncer.
+    """
+
+    def __init__(self, manager: AuditDatabaseManager):
+        self.manager = manager
+        self.rows: dict[type[models.Model], list[dict | None]] = {}
+        # (model, coalesce_key) -> index of the pending payload in rows[model]
+        self.pending: dict[tuple, int] = {}
+        # (model, index in rows[model]) of the debounced rows
+        self.debounced: set[tuple] = set()
+        # (model, object pk) of the objects whose rows are written in place
+        self.flushed: set[tuple] = set()
+
+    def add(self, model: type[models.Model], payloads: list[dict], debounced=False):
+        rows = self.rows.setdefault(model, [])
+        for payload in payloads:
+            key = getattr(payload, "coalesce_key", None)
+            index = None if key is None else self.pending.get((model, key))
+            if index is not None:
+                merged = rows[index].merge(payload)
+                if merged is not NotImplemented:
+                    rows[index] = merged
+                    if merged is None:
+                        del self.pending[(model, key)]
+                    if merged is None or merged["action"] != "update":
+                        self.debounced.discard((model, index))
+                    continue
+            if key is not None:
+                self.pending[(model, key)] = len(rows)
+            if debounced:
+                self.debounced.add((model, len(rows)))
+            rows.append(payload)
+
+    def debounces(self, key: tuple) -> bool:
+        """Whether a debounced row of the (model, object pk) ``key`` is here."""
+        model, object_pk = key
+        return any(
+            self.rows[model][index]["object_pk"] == object_pk
+            for debounced_model, index in self.debounced
+            if debounced_model is model
+        )
 
-        if transaction.get_connection().in_atomic_block:
-            transaction.on_commit(_do_insert)
-        else:
-            _do_insert()
+    def pending_payload(self, model: type[models.Model], key: str):
+        index = self.pending.get((model, key))
+        return None if index is None else self.rows[model][index]
+
+    def __call__(self):
+        rows = {}
+        debounced = []
+        debouncer = get_debouncer()
+        pending = set(self.flushed)
+        for model, payloads in self.rows.items():
+            written = []
+            for index, payload in enumerate(payloads):
+                if payload is None:
+                    continue
+                key = (model, payload["object_pk"])
+                if key in pending:
+                    # the row pending from earlier transactions goes first
+                    pending.discard(key)
+                    written.extend(debouncer.take(*key))
+                if (model, index) in self.debounced and key not in self.flushed:
+                    debounced.append((model, payload))
+                else:
+                    written.append(payload)
+            if not self.manager._defer_write(model, written):
+                rows[model] = written
+        if rows:
+            with self.manager.flush_transaction():
+                for model, payloads in rows.items():
+                    self.manager.write_log_rows(model, payloads)
+        for model, payload in debounced:
+            debouncer.add(model, payload)
+
+
+_manager: AuditDatabaseManager | None = None
+_manager_lock = threading.Lock()
+
+
+def get_audit_database_manager() -> AuditDatabaseManager:
+    """Return the audit database manager shared by the whole process."""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = AuditDatabaseManager()
+    return _manager
+
+
+@receiver(setting_changed)
+def _reset_audit_database_manager(setting, **kwargs):
+    if setting == "AWESOME_AUDIT_LOG" and _manager is not None:
+        _manager.reset()
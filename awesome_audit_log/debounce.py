@@ -0,0 +1,161 @@
+"""
+Debouncing of update rows.
+
+Updates of an object of a debounced model are held in memory for the
+DEBOUNCE window that starts with the first of them, merged into one row
+holding the first "before" and the last "after" image, and written by a
+background flusher thread once the window is over, or at process exit.
+"""
+
+import atexit
+import logging
+import threading
+import time
+
+from django.db import connections, models, transaction
+
+logger = logging.getLogger(__name__)
+
+# seconds between two runs of the flusher thread
+FLUSH_INTERVAL = 1.0
+
+
+class Debouncer:
+    """Pending update payloads, by (model, object pk)."""
+
+    def __init__(self, interval: float = FLUSH_INTERVAL):
+        self.interval = interval
+        # (model, object pk) -> [deadline, payload]
+        self._pending: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def add(self, model: type[models.Model], payload) -> None:
+        """
+        Merge the update ``payload`` into the pending one of its object.
+        Updates changing fields outside the debounced ones are written right
+        away, after the pending row of the object.
+        """
+        debounce = payload.plan.debounce
+        key = (model, payload["object_pk"])
+        if debounce.attnames is not None and not debounce.attnames.issuperset(
+            payload.changes()
+        ):
+            self._write(model, [*self._pop(key), payload])
+            return
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                self._pending[key] = [time.monotonic() + debounce.seconds, payload]
+            else:
+                entry[1] = entry[1].merge(payload)
+        self._start()
+
+    def flush_object(
+        self, model: type[models.Model], object_pk: str, using=None
+    ) -> None:
+        """
+        Write the pending row of an object before it's deleted: now, or with
+        the rows of the transaction of ``using`` once it commits, together
+        with the updates of the object debounced in it.
+        """
+        if transaction.get_connection(using).in_atomic_block:
+            from awesome_audit_log.db import get_audit_database_manager
+
+            get_audit_database_manager().flush_debounced_on_commit(
+                model, object_pk, using
+            )
+            return
+        payloads = self.take(model, object_pk)
+        if payloads:
+            self._write(model, payloads)
+
+    def take(self, model: type[models.Model], object_pk: str) -> list:
+        """Remove and return the pending row of an object, if any."""
+        return self._pop((model, object_pk))
+
+    def flush(self, force: bool = False) -> None:
+        """Write the pending rows whose window is over, or all of them."""
+        now = time.monotonic()
+        with self._lock:
+            due = [
+                key
+                for key, (deadline, _payload) in self._pending.items()
+                if force or deadline <= now
+            ]
+            entries = [(key[0], self._pending.pop(key)[1]) for key in due]
+        by_model: dict[type[models.Model], list] = {}
+        for model, payload in entries:
+            by_model.setdefault(model, []).append(payload)
+        for model, payloads in by_model.items():
+            self._write(model, payloads)
+
+    def clear(self) -> None:
+        """Drop the pending rows without writing them."""
+        with self._lock:
+            self._pending.clear()
+
+    def _pop(self, key: tuple) -> list:
+        with self._lock:
+            entry = self._pending.pop(key, None)
+        return [] if entry is None else [entry[1]]
+
+    def _write(self, model: type[models.Model], payloads: list) -> None:
+        # imported here, signals imports this module
+        from awesome_audit_log.signals import _insert_audit_logs
+
+        try:
+            _insert_audit_logs(model, payloads)
+        except Exception:
+            logger.exception(
+                "Failed to write %d debounced audit rows of %s",
+                len(payloads),
+                model._meta.label,
+            )
+
+    def _start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="awesome-audit-log-debounce", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            finally:
+                # the connections of this thread are not closed by Django
+                connections.close_all()
+
+
+_debouncer = Debouncer()
+
+
+def get_debouncer() -> Debouncer:
+    return _debouncer
+
+
+def debounce_update(model: type[models.Model], payload, using=None) -> None:
+    """
+    Hand an update payload of a debounced model to the debouncer, once the
+    transaction of ``using`` it was made in (if any) commits.
+    """
+    if transaction.get_connection(using).in_atomic_block:
+        from awesome_audit_log.db import get_audit_database_manager
+
+        # buffered with the other rows of the transaction, so a delete of the
+        # object in it can have it written first
+        get_audit_database_manager().buffer_debounced_row(model, payload, using)
+    else:
+        _debouncer.add(model, payload)
+
+
+@atexit.register
+def _flush_at_exit() -> None:
+    _debouncer.flush(force=True)
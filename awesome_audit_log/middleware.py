@@ -3,6 +3,7 @@ from __future__ import annotations
 from django.urls import resolve
 from django.utils.deprecation import MiddlewareMixin
 
+from awesome_audit_log.aio import bind_event_loop
 from awesome_audit_log.conf import get_setting
 from awesome_audit_log.context import RequestContext, clear_request_ctx, set_request_ctx
 
@@ -41,6 +42,12 @@ class RequestEntryPointMiddleware(MiddlewareMixin):
             user_agent=ua
         ))
 
+    async def __acall__(self, request):
+        # audit rows captured while serving the request are written by the
+        # event loop serving it (ASYNC_MODE "asyncio")
+        bind_event_loop()
+        return await super().__acall__(request)
+
     def process_response(self, request, response):
         clear_request_ctx()
         return response
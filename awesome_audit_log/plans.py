@@ -0,0 +1,220 @@
+"""
+Per-model audit plans.
+
+A plan holds everything the signal handlers need to know about a model
+(whether it is audited, which fields are serialized and how, where its log
+rows go) so that settings are parsed once per model instead of on every save.
+"""
+
+import inspect
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.db import models
+from django.db.models.fields.related_descriptors import ForeignKeyDeferredAttribute
+from django.db.models.query_utils import DeferredAttribute
+from django.dispatch import receiver
+
+from awesome_audit_log.conf import get_setting
+from awesome_audit_log.sampling import Sampler
+from awesome_audit_log.utils import converter_for_field
+
+
+@dataclass(frozen=True)
+class Debounce:
+    # length of the window, in seconds
+    seconds: float
+    # updates changing other fields aren't debounced; None for all fields
+    attnames: frozenset[str] | None = None
+
+
+@dataclass(frozen=True)
+class AuditPlan:
+    audited: bool
+    label: str
+    # attnames of the serialized concrete fields, in model order
+    attnames: tuple[str, ...]
+    # converter to a JSON-serializable value, one per attname
+    converters: tuple[Callable[[Any], Any], ...]
+    # whether the value can be read from the instance __dict__, i.e. the
+    # field has no descriptor of its own that transforms it
+    direct: tuple[bool, ...]
+    log_table: str
+    track_loaded_state: bool
+    capture_bulk: bool
+    # field name and attname -> attname, to resolve save(update_fields=...)
+    field_attnames: dict[str, str]
+    skip_noop_updates: bool
+    # merge the rows of one object within a transaction
+    coalesce: bool
+    # None when every event is recorded
+    sampler: Sampler | None
+    # attnames of auto_now fields, which change on every save
+    auto_now_attnames: frozenset[str]
+    # None when updates are recorded as they happen
+    debounce: Debounce | None
+
+    def is_noop_update(self, changes: dict) -> bool:
+        """
+        Whether an update with these changes should not be recorded: nothing
+        but auto_now fields changed and SKIP_NOOP_UPDATES is on.
+        """
+        return self.skip_noop_updates and self.auto_now_attnames.issuperset(changes)
+
+    def updated_attnames(self, update_fields) -> tuple[str, ...] | None:
+        """
+        Return the attnames written by ``save(update_fields=...)``, in model
+        order, or None when the whole row is saved.
+        """
+        if update_fields is None:
+            return None
+        updated = {self.field_attnames.get(name) for name in update_fields}
+        return tuple(name for name in self.attnames if name in updated)
+
+
+_plans: dict[type[models.Model], AuditPlan] = {}
+
+
+def get_audit_plan(model: type[models.Model]) -> AuditPlan:
+    try:
+        return _plans[model]
+    except KeyError:
+        plan = _plans[model] = _build_plan(model)
+        return plan
+
+
+def clear_audit_plans() -> None:
+    _plans.clear()
+
+
+@receiver(setting_changed)
+def _reset_audit_plans(setting, **kwargs):
+    if setting == "AWESOME_AUDIT_LOG":
+        clear_audit_plans()
+
+
+def _build_plan(model: type[models.Model]) -> AuditPlan:
+    label = f"{model._meta.app_label}.{model._meta.model_name}"
+    options = _model_options(label)
+    fields = _audited_fields(model, options)
+    field_attnames = {
+        **{field.name: field.attname for field in fields},
+        **{field.attname: field.attname for field in fields},
+    }
+    return AuditPlan(
+        audited=_is_audited(model, label),
+        label=label,
+        attnames=tuple(field.attname for field in fields),
+        converters=tuple(converter_for_field(field) for field in fields),
+        direct=tuple(
+            type(inspect.getattr_static(model, field.attname, None))
+            in (DeferredAttribute, ForeignKeyDeferredAttribute)
+            for field in fields
+        ),
+        log_table=f"{model._meta.db_table}_log",
+        track_loaded_state=bool(get_setting("TRACK_LOADED_STATE")),
+        capture_bulk=bool(get_setting("CAPTURE_BULK_OPERATIONS")),
+        field_attnames=field_attnames,
+        skip_noop_updates=bool(options.get("SKIP_NOOP_UPDATES")),
+        coalesce=bool(options.get("COALESCE_TRANSACTION_ROWS")),
+        sampler=_build_sampler(options),
+        auto_now_attnames=frozenset(
+            field.attname for field in fields if getattr(field, "auto_now", False)
+        ),
+        debounce=_build_debounce(options, field_attnames),
+    )
+
+
+def _audited_fields(model: type[models.Model], options: dict) -> list:
+    """
+    Concrete fields of the model narrowed by the FIELDS and EXCLUDE_FIELDS
+    model options, which accept field names and attnames.
+    """
+    include = options.get("FIELDS")
+    exclude = set(options.get("EXCLUDE_FIELDS") or ())
+    fields = []
+    for field in model._meta.concrete_fields:
+        if getattr(field, "many_to_many", False):
+            continue
+        names = {field.name, field.attname}
+        if include is not None and not names & set(include):
+            continue
+        if names & exclude:
+            continue
+        fields.append(field)
+    return fields
+
+
+def _build_sampler(options: dict) -> Sampler | None:
+    sample_rate = options.get("SAMPLE_RATE")
+    if sample_rate is None:
+        sample_rate = 1.0
+    if not 0 <= sample_rate <= 1:
+        raise ImproperlyConfigured(
+            f"AWESOME_AUDIT_LOG SAMPLE_RATE must be between 0 and 1, got {sample_rate!r}"
+        )
+    if sample_rate == 1 and options.get("RATE_LIMIT") is None:
+        return None
+    return Sampler(sample_rate, options.get("RATE_LIMIT"))
+
+
+def _build_debounce(options: dict, field_attnames: dict) -> Debounce | None:
+    """DEBOUNCE is a window in seconds, or a {"seconds": ..., "fields": [...]} dict."""
+    debounce = options.get("DEBOUNCE")
+    if debounce is None:
+        return None
+    if not isinstance(debounce, dict):
+        debounce = {"seconds": debounce}
+    seconds = debounce.get("seconds")
+    if not isinstance(seconds, int | float) or seconds <= 0:
+        raise ImproperlyConfigured(
+            f"AWESOME_AUDIT_LOG DEBOUNCE must be a positive number of seconds, "
+            f"got {seconds!r}"
+        )
+    fields = debounce.get("fields")
+    return Debounce(
+        seconds=float(seconds),
+        attnames=None
+        if fields is None
+        else frozenset(
+            field_attnames[name] for name in fields if name in field_attnames
+        ),
+    )
+
+
+def _model_options(label: str) -> dict:
+    """
+    Return the global options overridden by the MODEL_OPTIONS entry of the
+    model, if any. Keys are matched case-insensitively.
+    """
+    options = {
+        key: get_setting(key)
+        for key in (
+            "SKIP_NOOP_UPDATES",
+            "COALESCE_TRANSACTION_ROWS",
+            "SAMPLE_RATE",
+            "RATE_LIMIT",
+            "DEBOUNCE",
+        )
+    }
+    for key, overrides in (get_setting("MODEL_OPTIONS") or {}).items():
+        if key.lower() == label:
+            options.update(overrides)
+    return options
+
+
+def _is_audited(model: type[models.Model], label: str) -> bool:
+    if model._meta.app_label == "awesome_audit_log":
+        return False
+    if not get_setting("ENABLED"):
+        return False
+    models_opt_out = get_setting("NOT_AUDIT_MODELS")
+    if models_opt_out and label in set(models_opt_out):
+        return False
+    models_opt = get_setting("AUDIT_MODELS")
+    if models_opt == "all":
+        return True
+    return label in set(models_opt or [])
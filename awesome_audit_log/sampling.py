@@ -0,0 +1,74 @@
+"""
+Sampling and rate limiting of audit rows.
+
+A ``Sampler`` decides, before anything is fetched or serialized, whether an
+event of a model is recorded, and with which sampling rate: the share of the
+events it stands for, so counts can be extrapolated (``1 / sample_rate``
+events per recorded row).
+"""
+
+import random
+import threading
+import time
+
+
+class TokenBucket:
+    """Allows ``rate`` events per second on average, in bursts of ``burst``."""
+
+    def __init__(self, rate: float, burst: float | None = None):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(rate, 1))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class Sampler:
+    """
+    Samples the events of one model with probability ``sample_rate``, then
+    limits them with a token bucket of ``rate_limit`` events per second.
+
+    Events dropped by the rate limit are accounted to the next recorded one,
+    whose sampling rate is lowered accordingly.
+    """
+
+    def __init__(self, sample_rate: float = 1.0, rate_limit=None):
+        self.sample_rate = float(sample_rate)
+        self.bucket = _token_bucket(rate_limit)
+        self._dropped = 0
+        self._lock = threading.Lock()
+
+    def sample(self) -> float | None:
+        """Return the sampling rate of the event, or None to drop it."""
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return None
+        if self.bucket is None:
+            return self.sample_rate
+        if not self.bucket.take():
+            with self._lock:
+                self._dropped += 1
+            return None
+        with self._lock:
+            dropped, self._dropped = self._dropped, 0
+        return self.sample_rate / (dropped + 1)
+
+
+def _token_bucket(rate_limit) -> TokenBucket | None:
+    """RATE_LIMIT is events per second, or a {"rate": ..., "burst": ...} dict."""
+    if rate_limit is None:
+        return None
+    if isinstance(rate_limit, dict):
+        return TokenBucket(rate_limit["rate"], rate_limit.get("burst"))
+    return TokenBucket(rate_limit)
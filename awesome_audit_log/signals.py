@@ -1,88 +1,507 @@
 from datetime import datetime, timezone
 
+from django.apps import apps
+from django.core.signals import setting_changed
 from django.db import models
-from django.db.models.signals import post_save, pre_delete, pre_save
+from django.db.models.signals import (
+    m2m_changed,
+    post_init,
+    post_save,
+    pre_delete,
+    pre_save,
+)
 from django.dispatch import receiver
 
 from awesome_audit_log.conf import get_setting
 from awesome_audit_log.context import get_request_ctx
+from awesome_audit_log.db import get_audit_database_manager
+from awesome_audit_log.debounce import debounce_update, get_debouncer
+from awesome_audit_log.plans import get_audit_plan
+from awesome_audit_log.storm import summarize_event, summarizes_event
 from awesome_audit_log.tasks import (
     CELERY_AVAILABLE,
     insert_audit_log_async,
     insert_audit_log_sync,
+    insert_audit_logs_sync,
+)
+from awesome_audit_log.utils import (
+    LazyPayload,
+    capture_row,
+    convert_row,
+    resolve_payload,
+    _to_primitive,
+    diff_rows,
+    dumps,
+    row_to_dict,
+    serialize_row,
+    serialize_snapshot,
+    serialize_values,
+    snapshot_instance,
 )
-from awesome_audit_log.utils import diff_dicts, dumps, serialize_instance
+
+
+# set on instances whose delete row was already recorded with their deletion
+# group (see bulk.audit_collected_deletes)
+DELETE_GROUP_ATTR = "__audit_delete_group"
 
 
 def _should_audit_model(model: models.Model) -> bool:
-    if model._meta.app_label == "awesome_audit_log":
-        return False
-    if not get_setting("ENABLED"):
-        return False
-    models_opt_out = get_setting("NOT_AUDIT_MODELS")
-    label = f"{model._meta.app_label}.{model._meta.model_name}"
-    if models_opt_out and label in set(models_opt_out or []):
-        return False
-    models_opt = get_setting("AUDIT_MODELS")
-    if models_opt == "all":
-        return True
-    return label in set(models_opt or [])
-
-
-@receiver(pre_save)
-def _audit_pre_save(sender, instance, **kwargs):
-    if not _should_audit_model(sender):
+    return get_audit_plan(model).audited
+
+
+# set on instances by pre_save: the sampling rate of the save, None when the
+# model isn't sampled, SAMPLED_OUT when the save isn't recorded, or
+# SUMMARIZED when it's only counted in the audit storm summary
+SAMPLE_RATE_ATTR = "__audit_sample_rate"
+SAMPLED_OUT = object()
+SUMMARIZED = object()
+
+
+def sample_rate(plan):
+    """
+    Decide whether an event of the model is recorded, before anything is
+    fetched or serialized for it. Returns its sampling rate (None when the
+    model isn't sampled), SAMPLED_OUT or SUMMARIZED.
+    """
+    if plan.sampler is None:
+        rate = None
+    else:
+        rate = plan.sampler.sample()
+        if rate is None:
+            return SAMPLED_OUT
+    return SUMMARIZED if summarizes_event() else rate
+
+
+# set on instances between pre_clear and post_clear of a many-to-many field,
+# holds the related pks by field name
+M2M_CLEARED_ATTR = "__audit_m2m_cleared"
+
+# (signal, dispatch_uid, model) of every receiver connected by
+# connect_audit_receivers, so they can be disconnected again
+_connected: list[tuple] = []
+
+# (through model, reverse) -> name of the many-to-many field (or of its
+# reverse accessor) on the model the change was made from
+_m2m_names: dict[tuple, str] = {}
+
+
+def connect_audit_receivers() -> None:
+    """
+    Connect the audit receivers to the audited models only, so saves and
+    deletes of other models never reach the audit handlers.
+    """
+    disconnect_audit_receivers()
+    for model in apps.get_models(include_auto_created=True):
+        plan = get_audit_plan(model)
+        if not plan.audited:
+            continue
+        for signal, handler in _receivers():
+            if handler is _audit_post_init and not plan.track_loaded_state:
+                continue
+            dispatch_uid = f"awesome_audit_log.{handler.__name__}.{plan.label}"
+            signal.connect(handler, sender=model, weak=False, dispatch_uid=dispatch_uid)
+            _connected.append((signal, dispatch_uid, model))
+    _connect_m2m_receivers()
+
+
+def _connect_m2m_receivers() -> None:
+    for model in apps.get_models():
+        for field in model._meta.local_many_to_many:
+            through = field.remote_field.through
+            names = {}
+            if get_audit_plan(model).audited:
+                names[False] = field.name
+            if (
+                get_audit_plan(field.related_model).audited
+                and not field.remote_field.hidden
+            ):
+                names[True] = field.remote_field.get_accessor_name()
+            if not names:
+                continue
+            for reverse, name in names.items():
+                _m2m_names[(through, reverse)] = name
+            dispatch_uid = (
+                f"awesome_audit_log._audit_m2m_changed.{through._meta.label_lower}"
+            )
+            m2m_changed.connect(
+                _audit_m2m_changed,
+                sender=through,
+                weak=False,
+                dispatch_uid=dispatch_uid,
+            )
+            _connected.append((m2m_changed, dispatch_uid, through))
+
+
+def disconnect_audit_receivers() -> None:
+    _m2m_names.clear()
+    while _connected:
+        signal, dispatch_uid, model = _connected.pop()
+        signal.disconnect(sender=model, dispatch_uid=dispatch_uid)
+
+
+@receiver(setting_changed)
+def _reconnect_audit_receivers(setting, **kwargs):
+    if setting == "AWESOME_AUDIT_LOG":
+        connect_audit_receivers()
+
+
+def _receivers():
+    return (
+        (post_init, _audit_post_init),
+        (pre_save, _audit_pre_save),
+        (post_save, _audit_post_save),
+        (pre_delete, _audit_pre_delete),
+    )
+
+
+def _audit_post_init(sender, instance, **kwargs):
+    plan = get_audit_plan(sender)
+    if not plan.audited or not plan.track_loaded_state:
         return
-    if instance.pk:
-        try:
-            old = sender._default_manager.get(pk=instance.pk)
-            instance.__audit_before = serialize_instance(old)
-        except sender.DoesNotExist:
-            instance.__audit_before = None
+    instance.__audit_snapshot = snapshot_instance(instance, plan)
+
+
+def refresh_loaded_state(instance, fields=None) -> None:
+    """
+    Update the loaded state of the fields ``refresh_from_db()`` reloaded
+    (``fields``, or every loaded field when None).
+    """
+    plan = get_audit_plan(type(instance))
+    if not plan.audited or not plan.track_loaded_state:
+        return
+    attnames = None if fields is None else plan.updated_attnames(fields)
+    instance.__audit_snapshot = _saved_snapshot(plan, instance, attnames)
+
+
+def _audit_pre_save(sender, instance, update_fields=None, **kwargs):
+    plan = get_audit_plan(sender)
+    if not plan.audited:
+        return
+    rate = sample_rate(plan)
+    setattr(instance, SAMPLE_RATE_ATTR, rate)
+    attnames = plan.updated_attnames(update_fields)
+    if rate not in (SAMPLED_OUT, SUMMARIZED) and instance.pk and attnames != ():
+        instance.__audit_before = _loaded_state(plan, instance, attnames)
+        if instance.__audit_before is not None:
+            return
+        pending = _pending_payload(plan, sender, instance)
+        if pending is not None and pending.covers(attnames):
+            # the row of this save is merged into the pending one, which
+            # already holds the "before" image
+            instance.__audit_before = pending.before
+            return
+        # only the audited columns (of update_fields) are read
+        row = (
+            sender._default_manager.filter(pk=instance.pk)
+            .values(*(plan.attnames if attnames is None else attnames))
+            .first()
+        )
+        instance.__audit_before = (
+            serialize_values(plan, row) if row is not None else None
+        )
     else:
         instance.__audit_before = None
 
 
-@receiver(post_save)
-def _audit_post_save(sender, instance, created, **kwargs):
-    if not _should_audit_model(sender):
+def _pending_payload(plan, sender, instance) -> "_ObjectPayload | None":
+    """
+    Return the payload of the instance buffered in the current transaction,
+    when its rows are coalesced.
+    """
+    if not plan.coalesce:
+        return None
+    payload = get_audit_database_manager().pending_payload(sender, str(instance.pk))
+    if payload is None or payload["action"] == "delete":
+        return None
+    return payload
+
+
+def _loaded_state(plan, instance, attnames=None) -> tuple | None:
+    """
+    Return the "before" image recorded when the instance was loaded or last
+    saved, or None when it has to be fetched from the database.
+    """
+    if instance._state.adding or not plan.track_loaded_state:
+        return None
+    snapshot = getattr(instance, "__audit_snapshot", None)
+    if snapshot is None:
+        return None
+    return serialize_snapshot(plan, snapshot, attnames)
+
+
+def _audit_post_save(sender, instance, created, update_fields=None, **kwargs):
+    plan = get_audit_plan(sender)
+    if not plan.audited:
         return
 
+    attnames = None if created else plan.updated_attnames(update_fields)
+    if attnames == ():
+        # none of the saved fields is audited
+        return
+    rate = getattr(instance, SAMPLE_RATE_ATTR, None)
+    if rate is SUMMARIZED:
+        _summarize_save(plan, sender, instance, created, attnames)
+    elif rate is not SAMPLED_OUT:
+        _record_save(plan, sender, instance, created, attnames, rate)
+
+    if plan.track_loaded_state:
+        instance.__audit_snapshot = _saved_snapshot(plan, instance, attnames)
+
+
+def _record_save(plan, sender, instance, created, attnames, rate):
     before = getattr(instance, "__audit_before", None)
-    after = serialize_instance(instance)
-    payload = {
-        "action": "insert" if created else "update",
-        "object_pk": str(instance.pk),
-        "before": dumps(before),
-        "after": dumps(after),
-        "changes": dumps(diff_dicts(before, after)),
-        "created_at": datetime.now(timezone.utc).isoformat(),
-    }
+    # only the raw values are captured here, they are serialized and encoded
+    # when the row is written, i.e. not at all if the transaction rolls back
+    after = capture_row(plan, instance, attnames)
+    payload = _ObjectPayload(
+        plan,
+        before=before,
+        after=after,
+        action="insert" if created else "update",
+        object_pk=str(instance.pk),
+        created_at=datetime.now(timezone.utc).isoformat(),
+    )
+
+    if rate is not None:
+        payload["sample_rate"] = rate
 
     payload = _complete_request_data(payload)
 
-    _insert_audit_log(sender, payload)
+    if plan.debounce is not None and not created:
+        debounce_update(sender, payload, instance._state.db)
+    else:
+        _insert_audit_log(sender, payload)
+
+
+def _summarize_save(plan, sender, instance, created, attnames):
+    """
+    Count a save in the audit storm summary, with the fields it changed when
+    they are known without a query: those of the loaded state that differ,
+    otherwise the saved ones.
+    """
+    fields = None
+    if not created:
+        before = _loaded_state(plan, instance, attnames)
+        if before is not None:
+            after = serialize_row(plan, instance, attnames, fallback=before)
+            fields = diff_rows(plan, before, after)
+        else:
+            fields = plan.attnames if attnames is None else attnames
+    summarize_event(
+        sender,
+        "insert" if created else "update",
+        instance.pk,
+        fields,
+        instance._state.db,
+    )
+
+
+def _saved_snapshot(plan, instance, attnames) -> tuple:
+    """
+    Snapshot of the instance as it now is in the database: fields left out of
+    ``update_fields`` keep their previous snapshot value.
+    """
+    snapshot = snapshot_instance(instance, plan)
+    previous = getattr(instance, "__audit_snapshot", None)
+    if attnames is None or previous is None:
+        return snapshot
+    return tuple(
+        new if name in attnames else old
+        for name, new, old in zip(plan.attnames, snapshot, previous, strict=True)
+    )
 
 
-@receiver(pre_delete)
 def _audit_pre_delete(sender, instance, **kwargs):
-    if not _should_audit_model(sender):
+    plan = get_audit_plan(sender)
+    if not plan.audited:
+        return
+    if getattr(instance, DELETE_GROUP_ATTR, None):
+        return
+    rate = sample_rate(plan)
+    if rate is SAMPLED_OUT:
+        return
+    if rate is SUMMARIZED:
+        summarize_event(sender, "delete", instance.pk, using=instance._state.db)
+        return
+    payload = delete_payload(
+        plan, instance, datetime.now(timezone.utc).isoformat(), rate
+    )
+
+    _insert_audit_log(sender, payload)
+
+
+def delete_payload(plan, instance, created_at: str, rate=None) -> LazyPayload:
+    """Build the (lazy) payload of the delete row of ``instance``."""
+    if plan.debounce is not None:
+        # the pending update row goes first
+        get_debouncer().flush_object(
+            type(instance), str(instance.pk), instance._state.db
+        )
+    payload = _ObjectPayload(
+        plan,
+        deleted=capture_row(plan, instance),
+        action="delete",
+        object_pk=str(instance.pk),
+        created_at=created_at,
+    )
+    if rate is not None:
+        payload["sample_rate"] = rate
+    return _complete_request_data(payload)
+
+
+class _ObjectPayload(LazyPayload):
+    """
+    Lazy payload of a save or delete: ``before`` is the serialized "before"
+    image of an update, ``after`` the raw values captured after a save and
+    ``deleted`` the raw values captured before a delete.
+
+    With COALESCE_TRANSACTION_ROWS, the payloads of one object in the same
+    transaction are merged into one row holding the first "before" and the
+    last "after"; an insert followed by a delete leaves no row at all.
+    """
+
+    __slots__ = ("plan", "before", "after", "deleted")
+
+    def __init__(self, plan, before=None, after=None, deleted=None, **columns):
+        super().__init__(self._columns, **columns)
+        self.plan = plan
+        self.before = before
+        self.after = after
+        self.deleted = deleted
+        if plan.coalesce:
+            self.coalesce_key = columns["object_pk"]
+
+    def covers(self, attnames) -> bool:
+        """Whether this payload's "before" image has all of ``attnames``."""
+        if self["action"] == "insert":
+            return True
+        return all(
+            value is not models.DEFERRED
+            for name, value in zip(self.plan.attnames, self.before, strict=True)
+            if attnames is None or name in attnames
+        )
+
+    def merge(self, later: "_ObjectPayload") -> "_ObjectPayload | None":
+        action = self["action"]
+        if action == "delete":
+            return NotImplemented
+        if later["action"] == "delete":
+            if action == "insert":
+                return None
+            # the delete row keeps its own columns (created_at, group_id, ...)
+            return _ObjectPayload(
+                self.plan, before=self.before, deleted=later.deleted, **later
+            )
+        return self._replace(
+            before=None
+            if action == "insert"
+            else _first_known(self.before, later.before),
+            after=_last_known(self.after, later.after),
+        )
+
+    def _replace(self, **images) -> "_ObjectPayload":
+        images = {
+            "before": self.before,
+            "after": self.after,
+            "deleted": self.deleted,
+            **images,
+        }
+        return _ObjectPayload(self.plan, **images, **self)
+
+    def changes(self) -> dict:
+        """Changes of a save, by attname."""
+        return self._images()[2]
+
+    def _images(self) -> tuple:
+        after = convert_row(self.plan, self.after, fallback=self.before)
+        return self.before, after, diff_rows(self.plan, self.before, after)
+
+    def _columns(self) -> dict | None:
+        plan = self.plan
+        if self["action"] == "delete":
+            before = convert_row(plan, self.deleted)
+            if self.before is not None:
+                before = _first_known(self.before, before)
+            before = row_to_dict(plan, before)
+            return {
+                "before": dumps(before),
+                "after": dumps(None),
+                "changes": dumps(
+                    {k: {"from": v, "to": None} for k, v in before.items()}
+                ),
+            }
+        before, after, changes = self._images()
+        if (
+            self["action"] == "update"
+            and before is not None
+            and plan.is_noop_update(changes)
+        ):
+            return None
+        return {
+            "before": dumps(None if before is None else row_to_dict(plan, before)),
+            "after": dumps(row_to_dict(plan, after)),
+            "changes": dumps(changes),
+        }
+
+
+def _first_known(first: tuple | None, later: tuple | None) -> tuple | None:
+    """Merge two rows positionally, the first non-``DEFERRED`` value winning."""
+    if first is None or later is None:
+        return first if later is None else later
+    return tuple(
+        value if value is not models.DEFERRED else other
+        for value, other in zip(first, later, strict=True)
+    )
+
+
+def _last_known(first: tuple, later: tuple) -> tuple:
+    """Merge two rows positionally, the last non-``DEFERRED`` value winning."""
+    return _first_known(later, first)
+
+
+def _audit_m2m_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Record one row per add/remove/clear of a many-to-many field, on the log
+    table of the model it was made from, listing the related pks.
+    """
+    name = _m2m_names.get((sender, reverse))
+    if name is None or not get_audit_plan(type(instance)).audited:
+        return
+    if action == "pre_clear":
+        cleared = getattr(instance, M2M_CLEARED_ATTR, None) or {}
+        cleared[name] = list(getattr(instance, name).values_list("pk", flat=True))
+        setattr(instance, M2M_CLEARED_ATTR, cleared)
         return
-    before = serialize_instance(instance)
+    if action == "post_clear":
+        pks = getattr(instance, M2M_CLEARED_ATTR, {}).pop(name, [])
+    elif action in ("post_add", "post_remove"):
+        pks = pk_set
+    else:
+        return
+    if not pks:
+        return
+
+    operation = action.removeprefix("post_")
     payload = {
-        "action": "delete",
+        "action": f"m2m_{operation}",
         "object_pk": str(instance.pk),
-        "before": dumps(before),
+        "before": dumps(None),
         "after": dumps(None),
-        "changes": dumps(
-            {k: {"from": v, "to": None} for k, v in (before or {}).items()}
-        ),
+        "changes": dumps({name: {operation: sorted(_to_primitive(pk) for pk in pks)}}),
         "created_at": datetime.now(timezone.utc).isoformat(),
     }
 
     payload = _complete_request_data(payload)
 
-    _insert_audit_log(sender, payload)
+    _insert_audit_log(type(instance), payload)
+
+
+def _uses_celery() -> bool:
+    return (
+        bool(get_setting("ASYNC"))
+        and get_setting("ASYNC_MODE") == "celery"
+        and CELERY_AVAILABLE
+    )
 
 
 def _insert_audit_log(sender: models.Model, payload: dict[str, str]) -> None:
@@ -95,12 +514,30 @@ def _insert_audit_log(sender: models.Model, payload: dict[str, str]) -> None:
     """
     model_path = f"{sender._meta.app_label}.{sender._meta.model_name}"
 
-    if get_setting("ASYNC") and CELERY_AVAILABLE:
-        insert_audit_log_async.delay(model_path, payload)
+    if _uses_celery():
+        payload = resolve_payload(payload)
+        if payload is not None:
+            insert_audit_log_async.delay(model_path, payload)
     else:
         insert_audit_log_sync(sender, payload)
 
 
+def _insert_audit_logs(sender: models.Model, payloads: list[dict[str, str]]) -> None:
+    """
+    Insert several audit logs of the same model, in batches when logging
+    synchronously.
+
+    Args:
+        sender: Django model class
+        payloads: Audit log data dictionaries
+    """
+    if len(payloads) == 1 or _uses_celery():
+        for payload in payloads:
+            _insert_audit_log(sender, payload)
+    else:
+        insert_audit_logs_sync(sender, payloads)
+
+
 def _complete_request_data(payload: dict[str, str]):
     ctx = get_request_ctx()
     if ctx:
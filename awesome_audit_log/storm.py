@@ -0,0 +1,166 @@
+"""
+Audit storm protection.
+
+Once more than STORM_THRESHOLD save/delete events were recorded in one
+request context (HTTP request, management command, Celery task), the next
+events of that context are no longer recorded one by one: they are counted
+per model, once their transaction commits, into a "summary" row written when
+the context ends, or earlier in long-running contexts.
+"""
+
+import logging
+import time
+from datetime import datetime, timezone
+from functools import partial
+
+from django.db import models, transaction
+
+from awesome_audit_log.conf import get_setting
+from awesome_audit_log.context import get_request_ctx
+from awesome_audit_log.utils import _to_primitive, dumps
+
+logger = logging.getLogger(__name__)
+
+# action of the summary rows, whose object_pk is SUMMARY_PK
+SUMMARY_ACTION = "summary"
+SUMMARY_PK = "*"
+
+# at most this many pks are listed in a summary row
+SUMMARY_PKS = 100
+
+# the summary rows are written every this many summarized events, or once
+# this many seconds passed since the last ones, before the context ends
+SUMMARY_FLUSH_EVENTS = 10000
+SUMMARY_FLUSH_SECONDS = 60.0
+
+
+class ModelSummary:
+    """Summarized events of one model."""
+
+    __slots__ = ("actions", "pks", "pk_min", "pk_max", "fields", "first_at")
+
+    def __init__(self):
+        self.actions: dict[str, int] = {}
+        self.pks: list = []
+        self.pk_min = None
+        self.pk_max = None
+        self.fields: set[str] = set()
+        self.first_at = datetime.now(timezone.utc).isoformat()
+
+    def add(self, action: str, pk, fields=None) -> None:
+        self.actions[action] = self.actions.get(action, 0) + 1
+        pk = _to_primitive(pk)
+        if len(self.pks) < SUMMARY_PKS:
+            self.pks.append(pk)
+        try:
+            if self.pk_min is None or pk < self.pk_min:
+                self.pk_min = pk
+            if self.pk_max is None or pk > self.pk_max:
+                self.pk_max = pk
+        except TypeError:
+            pass
+        if fields:
+            self.fields.update(fields)
+
+    def changes(self) -> dict:
+        return {
+            "count": sum(self.actions.values()),
+            "actions": self.actions,
+            "pk_min": self.pk_min,
+            "pk_max": self.pk_max,
+            "pks": self.pks,
+            "fields": sorted(self.fields),
+        }
+
+
+class AuditStorm:
+    """Audited events of one request context, summarized past ``threshold``."""
+
+    def __init__(self, threshold: int):
+        self.threshold = threshold
+        self.events = 0
+        self.summaries: dict[type[models.Model], ModelSummary] = {}
+        # summarized events not written yet, and when the last ones were
+        self.summarized = 0
+        self.flushed_at = time.monotonic()
+
+    def count(self) -> bool:
+        """Count an event; return whether it's summarized."""
+        self.events += 1
+        if self.events == self.threshold + 1:
+            ctx = get_request_ctx()
+            logger.warning(
+                "Audit storm: more than %d audited events in %s %s, "
+                "the next ones are summarized per model",
+                self.threshold,
+                ctx.entry_point,
+                ctx.path or ctx.route,
+            )
+        return self.events > self.threshold
+
+    def summarize(self, model: type[models.Model], action: str, pk, fields=None):
+        summary = self.summaries.get(model)
+        if summary is None:
+            summary = self.summaries[model] = ModelSummary()
+        summary.add(action, pk, fields)
+        self.summarized += 1
+        if (
+            self.summarized >= SUMMARY_FLUSH_EVENTS
+            or time.monotonic() - self.flushed_at >= SUMMARY_FLUSH_SECONDS
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write one summary row per model."""
+        # imported here, signals imports this module
+        from awesome_audit_log.signals import _complete_request_data, _insert_audit_log
+
+        summaries, self.summaries = self.summaries, {}
+        self.summarized = 0
+        self.flushed_at = time.monotonic()
+        for model, summary in summaries.items():
+            payload = {
+                "action": SUMMARY_ACTION,
+                "object_pk": SUMMARY_PK,
+                "before": dumps(None),
+                "after": dumps(None),
+                "changes": dumps(summary.changes()),
+                "created_at": summary.first_at,
+            }
+
+            payload = _complete_request_data(payload)
+
+            _insert_audit_log(model, payload)
+
+
+def summarizes_event() -> bool:
+    """
+    Count a save/delete event in the storm of the current request context and
+    return whether it's summarized instead of recorded.
+    """
+    threshold = get_setting("STORM_THRESHOLD")
+    if threshold is None:
+        return False
+    ctx = get_request_ctx()
+    if ctx is None:
+        return False
+    if ctx.audit_storm is None:
+        ctx.audit_storm = AuditStorm(threshold)
+    return ctx.audit_storm.count()
+
+
+def summarize_event(
+    model: type[models.Model], action: str, pk, fields=None, using=None
+) -> None:
+    """
+    Add an event counted by ``summarizes_event`` to its model summary, once
+    the transaction of ``using`` it was made in (if any) commits.
+    """
+    ctx = get_request_ctx()
+    if ctx is None or ctx.audit_storm is None:
+        return
+    summarize = partial(ctx.audit_storm.summarize, model, action, pk, fields)
+    if transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(summarize, using=using)
+    else:
+        summarize()
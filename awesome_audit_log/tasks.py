@@ -3,30 +3,23 @@ Celery tasks for async audit logging.
 """
 
 import logging
+import sys
+from importlib.util import find_spec
 from typing import Any, Dict
 
 from django.apps import apps
 from django.db import models
 
-logger = logging.getLogger(__name__)
-
-try:
-    from celery import shared_task  # type: ignore
+from awesome_audit_log.conf import get_setting
 
-    CELERY_AVAILABLE = True
-except ImportError:
-    CELERY_AVAILABLE = False
+logger = logging.getLogger(__name__)
 
-    # Create a dummy decorator for when Celery is not available
-    def shared_task(*args, **kwargs):
-        def decorator(func):
-            return func
+CELERY_AVAILABLE = find_spec("celery") is not None
 
-        return decorator
+ASYNC_TASK_NAME = "awesome_audit_log.tasks.insert_audit_log_async"
 
 
-@shared_task(bind=True, max_retries=3)
-def insert_audit_log_async(self, model_path: str, payload: Dict[str, Any]) -> None:
+def _insert_audit_log_async(self, model_path: str, payload: Dict[str, Any]) -> None:
     """
     Async task to insert audit log entry.
 
@@ -40,10 +33,9 @@ def insert_audit_log_async(self, model_path: str, payload: Dict[str, Any]) -> No
         model_class = apps.get_model(app_label, model_name)
 
         # Import here to avoid circular imports
-        from awesome_audit_log.db import AuditDatabaseManager
+        from awesome_audit_log.db import get_audit_database_manager
 
-        audit_manager = AuditDatabaseManager()
-        audit_manager.insert_log_row(model_class, payload)
+        get_audit_database_manager().insert_log_row(model_class, payload)
 
         logger.debug(f"Successfully inserted audit log for {model_path}")
 
@@ -53,6 +45,55 @@ def insert_audit_log_async(self, model_path: str, payload: Dict[str, Any]) -> No
         raise self.retry(countdown=60 * (2**self.request.retries), exc=exc)
 
 
+def _build_async_task():
+    from celery import shared_task  # type: ignore
+
+    return shared_task(bind=True, max_retries=3, name=ASYNC_TASK_NAME)(
+        _insert_audit_log_async
+    )
+
+
+class _LazyCeleryTask:
+    """
+    Stand-in for the Celery task that only imports Celery when the task is
+    first used, so importing this module with ASYNC off doesn't pull Celery in.
+    """
+
+    __slots__ = ("_task",)
+
+    def __init__(self):
+        object.__setattr__(self, "_task", None)
+
+    def _resolve(self):
+        if self._task is None:
+            object.__setattr__(self, "_task", _build_async_task())
+        return self._task
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._resolve(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self._resolve(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+
+if not CELERY_AVAILABLE:
+    insert_audit_log_async = _insert_audit_log_async
+elif "celery" in sys.modules or (
+    get_setting("ASYNC") and get_setting("ASYNC_MODE") == "celery"
+):
+    # Celery workers import this module through task autodiscovery, so the
+    # task has to be registered right away there.
+    insert_audit_log_async = _build_async_task()
+else:
+    insert_audit_log_async = _LazyCeleryTask()
+
+
 def insert_audit_log_sync(model: models.Model, payload: Dict[str, Any]) -> None:
     """
     Synchronous audit log insertion (fallback when Celery is not available).
@@ -61,7 +102,20 @@ def insert_audit_log_sync(model: models.Model, payload: Dict[str, Any]) -> None:
         model: Django model instance
         payload: Audit log data dictionary
     """
-    from awesome_audit_log.db import AuditDatabaseManager
+    from awesome_audit_log.db import get_audit_database_manager
+
+    get_audit_database_manager().insert_log_row(model, payload)
+
+
+def insert_audit_logs_sync(model: models.Model, payloads: list[Dict[str, Any]]) -> None:
+    """
+    Synchronous insertion of several audit logs of the same model, written
+    in batches.
+
+    Args:
+        model: Django model class
+        payloads: Audit log data dictionaries
+    """
+    from awesome_audit_log.db import get_audit_database_manager
 
-    audit_manager = AuditDatabaseManager()
-    audit_manager.insert_log_row(model, payload)
+    get_audit_database_manager().insert_log_rows(model, payloads)
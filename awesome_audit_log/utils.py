@@ -1,9 +1,21 @@
+import copy
 import datetime as dt
 import decimal
 import json
+import logging
+import uuid
+from collections.abc import Callable
+from importlib.util import find_spec
 from typing import Any
 
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
 from django.db import models
+from django.dispatch import receiver
+
+from awesome_audit_log.conf import get_setting
+
+logger = logging.getLogger(__name__)
 
 
 def _to_primitive(value: Any) -> Any:
@@ -17,20 +29,236 @@ def _to_primitive(value: Any) -> Any:
         return float(value)
     return str(value)
 
-def serialize_instance(instance: models.Model) -> dict:
-    """Serialize concrete fields of a model instance to a JSON-serializable dict."""
-    data = {}
-    for field in instance._meta.fields:
-        if (
-            getattr(field, "concrete", False)
-            and not getattr(field, "many_to_many", False)
-        ):
-            name = field.attname if hasattr(field, "attname") else field.name
-            try:
-                data[name] = _to_primitive(getattr(instance, name))
-            except Exception:
-                data[name] = None
-    return data
+
+def _exact(kind: type, convert: Callable[[Any], Any] | None = None) -> Callable:
+    """
+    Build a converter for values of exactly type ``kind``; anything else (None,
+    subclasses, unexpected types) goes through ``_to_primitive``.
+    """
+    if convert is None:
+
+        def converter(value):
+            return value if value.__class__ is kind else _to_primitive(value)
+
+    else:
+
+        def converter(value):
+            return convert(value) if value.__class__ is kind else _to_primitive(value)
+
+    return converter
+
+
+def _to_json(value: Any) -> Any:
+    """Keep JSONField values as JSON, converting only what JSON can't hold."""
+    if isinstance(value, dict):
+        return {str(key): _to_json(item) for key, item in value.items()}
+    if isinstance(value, list | tuple):
+        return [_to_json(item) for item in value]
+    return _to_primitive(value)
+
+
+_to_int = _exact(int)
+_to_str = _exact(str)
+
+# internal type -> converter; fields not listed here (custom fields, ...) use
+# _to_primitive
+FIELD_CONVERTERS: dict[str, Callable[[Any], Any]] = {
+    "AutoField": _to_int,
+    "BigAutoField": _to_int,
+    "SmallAutoField": _to_int,
+    "IntegerField": _to_int,
+    "BigIntegerField": _to_int,
+    "SmallIntegerField": _to_int,
+    "PositiveIntegerField": _to_int,
+    "PositiveBigIntegerField": _to_int,
+    "PositiveSmallIntegerField": _to_int,
+    "BooleanField": _exact(bool),
+    "FloatField": _exact(float),
+    "CharField": _to_str,
+    "TextField": _to_str,
+    "SlugField": _to_str,
+    "FilePathField": _to_str,
+    "GenericIPAddressField": _to_str,
+    "DecimalField": _exact(decimal.Decimal, float),
+    "DateTimeField": _exact(dt.datetime, dt.datetime.isoformat),
+    "DateField": _exact(dt.date, dt.date.isoformat),
+    "TimeField": _exact(dt.time, dt.time.isoformat),
+    "DurationField": _exact(dt.timedelta, str),
+    "UUIDField": _exact(uuid.UUID, str),
+    "JSONField": _to_json,
+}
+
+
+def converter_for_field(field: models.Field) -> Callable[[Any], Any]:
+    """Return the converter of a concrete field, following relations to their target."""
+    if field.is_relation:
+        return converter_for_field(field.target_field)
+    return FIELD_CONVERTERS.get(field.get_internal_type(), _to_primitive)
+
+
+def serialize_row(
+    plan,
+    instance: models.Model,
+    attnames: tuple[str, ...] | None = None,
+    fallback: tuple | None = None,
+) -> tuple:
+    """
+    Serialize the audited fields of a model instance to a tuple of
+    JSON-serializable values, positional with ``plan.attnames``.
+
+    Fields left out of ``attnames`` are ``DEFERRED``. Deferred fields are never
+    loaded: their value is taken from the ``fallback`` row (e.g. the "before"
+    image) when given, otherwise they are ``DEFERRED`` too.
+    """
+    raw = capture_row(plan, instance, attnames, copy_mutable=False)
+    return convert_row(plan, raw, fallback)
+
+
+def capture_row(
+    plan,
+    instance: models.Model,
+    attnames: tuple[str, ...] | None = None,
+    copy_mutable: bool = True,
+) -> tuple:
+    """
+    Capture the raw values of the audited fields of a model instance, to be
+    converted later by ``convert_row``. Fields left out of ``attnames`` and
+    deferred fields are ``DEFERRED``. Mutable values are copied unless
+    ``copy_mutable`` is False, i.e. when they are converted right away.
+    """
+    loaded = instance.__dict__
+    row = []
+    for name, direct in zip(plan.attnames, plan.direct, strict=True):
+        if (attnames is not None and name not in attnames) or name not in loaded:
+            row.append(models.DEFERRED)
+            continue
+        try:
+            value = loaded[name] if direct else getattr(instance, name)
+        except Exception:
+            value = None
+        row.append(_copy_mutable(value) if copy_mutable else value)
+    return tuple(row)
+
+
+def convert_row(plan, raw: tuple, fallback: tuple | None = None) -> tuple:
+    """
+    Convert a row captured by ``capture_row`` to JSON-serializable values,
+    ``DEFERRED`` values being taken from ``fallback`` when given.
+    """
+    row = []
+    for index, (convert, value) in enumerate(zip(plan.converters, raw, strict=True)):
+        if value is models.DEFERRED:
+            row.append(models.DEFERRED if fallback is None else fallback[index])
+            continue
+        try:
+            row.append(convert(value))
+        except Exception:
+            row.append(None)
+    return tuple(row)
+
+
+def row_to_dict(plan, row: tuple) -> dict:
+    """Turn a row from ``serialize_row`` into a dict, leaving out ``DEFERRED`` fields."""
+    return {
+        name: value
+        for name, value in zip(plan.attnames, row, strict=True)
+        if value is not models.DEFERRED
+    }
+
+
+def diff_rows(plan, before: tuple | None, after: tuple) -> dict:
+    """
+    Positional counterpart of ``diff_dicts`` for two rows of the same plan,
+    ``DEFERRED`` values comparing like missing keys.
+    """
+    changes = {}
+    if before is None:
+        for name, new in zip(plan.attnames, after, strict=True):
+            if new is not None and new is not models.DEFERRED:
+                changes[name] = {"from": None, "to": new}
+        return changes
+    for name, old, new in zip(plan.attnames, before, after, strict=True):
+        if old is new:
+            continue
+        if old is models.DEFERRED:
+            old = None
+        if new is models.DEFERRED:
+            new = None
+        if old != new:
+            changes[name] = {"from": old, "to": new}
+    return changes
+
+
+def serialize_instance(
+    instance: models.Model,
+    attnames: tuple[str, ...] | None = None,
+    fallback: dict | None = None,
+) -> dict:
+    """
+    Serialize concrete fields of a model instance to a JSON-serializable dict,
+    limited to ``attnames`` when given.
+
+    Deferred fields are never loaded: their value is taken from ``fallback``
+    (e.g. the "before" image) when it has one, otherwise they are left out.
+    """
+    from awesome_audit_log.plans import get_audit_plan
+
+    plan = get_audit_plan(type(instance))
+    if fallback is not None:
+        fallback = tuple(fallback.get(name, models.DEFERRED) for name in plan.attnames)
+    return row_to_dict(plan, serialize_row(plan, instance, attnames, fallback))
+
+
+def snapshot_instance(instance: models.Model, plan) -> tuple:
+    """
+    Capture the raw values of the audited fields of a model instance.
+
+    Deferred fields are stored as ``DEFERRED`` and mutable values (e.g. from a
+    JSONField) are copied so later in-place changes don't leak into the snapshot.
+    """
+    values = instance.__dict__
+    return tuple(
+        _copy_mutable(values.get(name, models.DEFERRED)) for name in plan.attnames
+    )
+
+
+def serialize_snapshot(
+    plan, snapshot: tuple, attnames: tuple[str, ...] | None = None
+) -> tuple | None:
+    """
+    Serialize a snapshot taken by ``snapshot_instance`` to a row like
+    ``serialize_row`` does. Returns None if any (requested) field was not
+    loaded.
+    """
+    row = []
+    for name, convert, value in zip(
+        plan.attnames, plan.converters, snapshot, strict=True
+    ):
+        if attnames is not None and name not in attnames:
+            row.append(models.DEFERRED)
+        elif value is models.DEFERRED:
+            return None
+        else:
+            row.append(convert(value))
+    return tuple(row)
+
+
+def serialize_values(plan, values: dict) -> tuple:
+    """
+    Serialize a row fetched with ``QuerySet.values()`` like ``serialize_row``
+    does, fields that weren't selected being ``DEFERRED``.
+    """
+    return tuple(
+        convert(values[name]) if name in values else models.DEFERRED
+        for name, convert in zip(plan.attnames, plan.converters, strict=True)
+    )
+
+
+def _copy_mutable(value: Any) -> Any:
+    if isinstance(value, dict | list):
+        return copy.deepcopy(value)
+    return value
+
 
 def diff_dicts(before: dict | None, after: dict | None) -> dict:
     before = before or {}
@@ -42,5 +270,122 @@ def diff_dicts(before: dict | None, after: dict | None) -> dict:
             changes[k] = {"from": before.get(k), "to": after.get(k)}
     return changes
 
+
+class LazyPayload(dict):
+    """
+    Audit payload whose ``before``, ``after`` and ``changes`` columns are only
+    built, by calling ``build``, when the row is written. Rows of transactions
+    that roll back are then never serialized nor encoded. ``build`` returns
+    None when the row should be dropped after all.
+
+    Payloads with a ``coalesce_key`` are merged by the transaction buffer
+    with later payloads of the same key through ``merge``.
+    """
+
+    __slots__ = ("build", "coalesce_key")
+
+    def __init__(self, build: Callable[[], dict | None], **columns):
+        super().__init__(**columns)
+        self.build = build
+        self.coalesce_key = None
+
+    def resolve(self) -> dict | None:
+        columns = self.build()
+        return None if columns is None else {**self, **columns}
+
+    def merge(self, later: "LazyPayload") -> "LazyPayload | None":
+        """
+        Return the payload standing for this one followed by ``later``, None
+        when they cancel out, or NotImplemented to keep both.
+        """
+        return NotImplemented
+
+
+def resolve_payload(payload: dict) -> dict | None:
+    """Return the complete columns of a payload, building them if it's lazy."""
+    if isinstance(payload, LazyPayload):
+        return payload.resolve()
+    return payload
+
+
+def _json_encoder() -> Callable[[Any], str]:
+    encoder = json.JSONEncoder(
+        ensure_ascii=False, separators=(",", ":"), default=_to_primitive
+    )
+    return encoder.encode
+
+
+def _orjson_encoder() -> Callable[[Any], str]:
+    import orjson  # type: ignore
+
+    def encode(obj):
+        return orjson.dumps(
+            obj, default=_to_primitive, option=orjson.OPT_NON_STR_KEYS
+        ).decode()
+
+    return encode
+
+
+def _msgspec_encoder() -> Callable[[Any], str]:
+    import msgspec  # type: ignore
+
+    encoder = msgspec.json.Encoder(enc_hook=_to_primitive, decimal_format="number")
+
+    def encode(obj):
+        return encoder.encode(obj).decode()
+
+    return encode
+
+
+ENCODERS = {
+    "json": _json_encoder,
+    "orjson": _orjson_encoder,
+    "msgspec": _msgspec_encoder,
+}
+
+_encoder: Callable[[Any], str] | None = None
+
+
+def get_encoder() -> Callable[[Any], str]:
+    """
+    Return the JSON encoder selected by the ENCODER setting, built once.
+
+    "auto" picks orjson, then msgspec, when installed. A named encoder that
+    isn't installed falls back to the standard library with a warning.
+    """
+    global _encoder
+    if _encoder is None:
+        _encoder = _build_encoder(get_setting("ENCODER"))
+    return _encoder
+
+
+def _build_encoder(name: str) -> Callable[[Any], str]:
+    if name == "auto":
+        for candidate in ("orjson", "msgspec"):
+            if find_spec(candidate) is not None:
+                return ENCODERS[candidate]()
+        return _json_encoder()
+    if name not in ENCODERS:
+        raise ImproperlyConfigured(
+            f"AWESOME_AUDIT_LOG['ENCODER'] must be one of "
+            f"{', '.join(['auto', *ENCODERS])}, got {name!r}"
+        )
+    try:
+        return ENCODERS[name]()
+    except ImportError:
+        logger.warning(
+            "Audit log encoder %r is not installed, using the standard json module",
+            name,
+        )
+        return _json_encoder()
+
+
+@receiver(setting_changed)
+def _reset_encoder(setting, **kwargs):
+    global _encoder
+    if setting == "AWESOME_AUDIT_LOG":
+        _encoder = None
+
+
 def dumps(obj) -> str:
-    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str)
+    return get_encoder()(obj)
@@ -0,0 +1,203 @@
+"""
+In-process background writer, used with ASYNC on and ASYNC_MODE="thread".
+
+Audit rows are put on a bounded queue instead of being written by the thread
+that captured them; a daemon thread drains the queue in batches of up to
+ASYNC_BATCH_SIZE rows, waiting at most ASYNC_FLUSH_INTERVAL seconds for a
+batch to fill. What happens when the queue is full is set by
+ASYNC_QUEUE_FULL. The queue is flushed when the process exits, and when a
+Celery worker process ends.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.db import close_old_connections, models
+from django.dispatch import receiver
+
+from awesome_audit_log.conf import get_setting
+
+logger = logging.getLogger(__name__)
+
+# ASYNC_QUEUE_FULL policies
+BLOCK = "block"
+DROP = "drop"
+SYNC = "sync"
+
+# seconds flush() waits for the batch being written by the writer thread
+FLUSH_TIMEOUT = 10.0
+
+
+class BackgroundWriter:
+    def __init__(
+        self,
+        queue_size: int,
+        batch_size: int,
+        flush_interval: float,
+        queue_full: str,
+    ):
+        if queue_full not in (BLOCK, DROP, SYNC):
+            raise ImproperlyConfigured(
+                f"AWESOME_AUDIT_LOG ASYNC_QUEUE_FULL must be one of "
+                f"{BLOCK!r}, {DROP!r} or {SYNC!r}, got {queue_full!r}"
+            )
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_full = queue_full
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        # held while a batch is written, so flush() can wait for it
+        self._writing = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+    def put(self, model: type[models.Model], payloads: list[dict]) -> None:
+        """Queue rows of ``model`` to be written by the writer thread."""
+        self._start()
+        for payload in payloads:
+            if self.queue_full == BLOCK:
+                self._queue.put((model, payload))
+                continue
+            try:
+                self._queue.put_nowait((model, payload))
+            except queue.Full:
+                self._handle_full(model, payload)
+
+    def _handle_full(self, model, payload) -> None:
+        if self.queue_full == SYNC:
+            write_batch([(model, payload)])
+            return
+        self.dropped += 1
+        if self.dropped == 1 or self.dropped % 1000 == 0:
+            logger.warning(
+                "Audit writer queue is full, %d audit rows dropped so far",
+                self.dropped,
+            )
+
+    def flush(self) -> None:
+        """Write every queued row now, from the calling thread."""
+        if not self._writing.acquire(timeout=FLUSH_TIMEOUT):
+            logger.warning("Audit writer is still busy, flushing anyway")
+        else:
+            self._writing.release()
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                return
+            write_batch(batch)
+
+    def stop(self) -> None:
+        """Stop the writer thread and write what is left in the queue."""
+        self._stopped.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            # let it write the batch it's collecting
+            thread.join(FLUSH_TIMEOUT)
+        self.flush()
+
+    def _drain(self, limit: int) -> list:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _start(self) -> None:
+        # a forked process inherits the thread object, not the thread
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="awesome-audit-log-writer", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            with self._writing:
+                batch = [first]
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=timeout))
+                    except queue.Empty:
+                        break
+                # the connections of this thread are not managed by Django
+                close_old_connections()
+                write_batch(batch)
+
+
+def write_batch(batch: list) -> None:
+    """Write ``(model, payload)`` pairs, grouped per model, in one flush."""
+    from awesome_audit_log.db import get_audit_database_manager
+
+    manager = get_audit_database_manager()
+    by_model: dict[type[models.Model], list] = {}
+    for model, payload in batch:
+        by_model.setdefault(model, []).append(payload)
+    try:
+        with manager.flush_transaction():
+            for model, payloads in by_model.items():
+                manager.write_log_rows(model, payloads)
+    except Exception:
+        logger.exception("Failed to write %d audit rows", len(batch))
+
+
+_writer: BackgroundWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def uses_background_writer() -> bool:
+    return bool(get_setting("ASYNC")) and get_setting("ASYNC_MODE") == "thread"
+
+
+def get_background_writer() -> BackgroundWriter:
+    """Return the background writer of the process, built from the settings."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = BackgroundWriter(
+                    queue_size=get_setting("ASYNC_QUEUE_SIZE"),
+                    batch_size=get_setting("ASYNC_BATCH_SIZE"),
+                    flush_interval=get_setting("ASYNC_FLUSH_INTERVAL"),
+                    queue_full=get_setting("ASYNC_QUEUE_FULL"),
+                )
+    return _writer
+
+
+def flush_background_writer() -> None:
+    """Write the queued audit rows now, e.g. on worker shutdown."""
+    if _writer is not None:
+        _writer.flush()
+
+
+@receiver(setting_changed)
+def _reset_background_writer(setting, **kwargs):
+    global _writer
+    if setting == "AWESOME_AUDIT_LOG" and _writer is not None:
+        writer, _writer = _writer, None
+        writer.stop()
+
+
+@atexit.register
+def _flush_at_exit() -> None:
+    if _writer is not None:
+        _writer.stop()
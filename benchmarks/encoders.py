@@ -0,0 +1,73 @@
+"""
+Benchmark of the JSON encoders selectable with the ENCODER setting.
+
+Encodes the before/after/changes of an update of a wide model, as done for
+every audited save, with each encoder that is installed.
+
+    python benchmarks/encoders.py [--number N] [--fields N]
+"""
+
+import argparse
+import sys
+import timeit
+from importlib.util import find_spec
+from pathlib import Path
+
+import django
+from django.conf import settings
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+settings.configure(INSTALLED_APPS=["awesome_audit_log"])
+django.setup()
+
+from awesome_audit_log.utils import ENCODERS  # noqa: E402
+
+
+def _payloads(fields: int) -> tuple[dict, dict, dict]:
+    # already converted values, like the rows built by serialize_row
+    before = {"id": 1}
+    for i in range(fields):
+        kind = i % 5
+        if kind == 0:
+            before[f"name_{i}"] = f"Customer name {i} with some ünïcode"
+        elif kind == 1:
+            before[f"count_{i}"] = i * 1000
+        elif kind == 2:
+            before[f"price_{i}"] = i + 0.99
+        elif kind == 3:
+            before[f"at_{i}"] = "2024-01-02T03:04:05.123456+00:00"
+        else:
+            before[f"flag_{i}"] = bool(i % 2)
+    after = {**before, "count_1": 2000, "name_0": "Renamed"}
+    changes = {
+        key: {"from": before[key], "to": after[key]}
+        for key in after
+        if before[key] != after[key]
+    }
+    return before, after, changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=50_000)
+    parser.add_argument("--fields", type=int, default=40)
+    args = parser.parse_args()
+
+    payloads = _payloads(args.fields)
+    for name, build in ENCODERS.items():
+        if name != "json" and find_spec(name) is None:
+            print(f"{name:<10} not installed")
+            continue
+        encode = build()
+
+        def case(encode=encode):
+            for payload in payloads:
+                encode(payload)
+
+        seconds = min(timeit.repeat(case, number=args.number, repeat=5))
+        print(f"{name:<10} {seconds / args.number * 1e6:8.2f} us/save")
+
+
+if __name__ == "__main__":
+    main()
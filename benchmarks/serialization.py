@@ -0,0 +1,99 @@
+"""
+Micro-benchmark of the serializer and differ used for every audited save.
+
+Compares the compiled per-field converters and the positional differ against
+the generic conversion (``_to_primitive`` through ``getattr``) and
+``diff_dicts``.
+
+    python benchmarks/serialization.py [--number N]
+"""
+
+import argparse
+import datetime as dt
+import decimal
+import sys
+import timeit
+import uuid
+from pathlib import Path
+
+import django
+from django.conf import settings
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+settings.configure(
+    INSTALLED_APPS=["django.contrib.contenttypes", "awesome_audit_log"],
+    DATABASES={"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}},
+    USE_TZ=True,
+)
+django.setup()
+
+from django.db import models  # noqa: E402
+
+from awesome_audit_log.plans import get_audit_plan  # noqa: E402
+from awesome_audit_log.utils import (  # noqa: E402
+    _to_primitive,
+    diff_dicts,
+    diff_rows,
+    row_to_dict,
+    serialize_row,
+)
+
+
+class Order(models.Model):
+    reference = models.UUIDField()
+    customer = models.CharField(max_length=100)
+    notes = models.TextField()
+    quantity = models.IntegerField()
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    weight = models.FloatField()
+    paid = models.BooleanField()
+    placed_at = models.DateTimeField()
+    ship_on = models.DateField()
+    metadata = models.JSONField()
+
+    class Meta:
+        app_label = "benchmarks"
+
+
+def _generic_serialize(instance, attnames):
+    return {name: _to_primitive(getattr(instance, name)) for name in attnames}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=100_000)
+    number = parser.parse_args().number
+
+    order = Order(
+        pk=1,
+        reference=uuid.uuid4(),
+        customer="Ada",
+        notes="x" * 200,
+        quantity=3,
+        price=decimal.Decimal("9.99"),
+        weight=1.5,
+        paid=True,
+        placed_at=dt.datetime.now(dt.timezone.utc),
+        ship_on=dt.date.today(),
+        metadata={"source": "web"},
+    )
+    plan = get_audit_plan(Order)
+    before = serialize_row(plan, order)
+    order.quantity = 4
+    after = serialize_row(plan, order)
+    before_dict, after_dict = row_to_dict(plan, before), row_to_dict(plan, after)
+
+    cases = {
+        "serialize generic": lambda: _generic_serialize(order, plan.attnames),
+        "serialize compiled": lambda: serialize_row(plan, order),
+        "diff dicts": lambda: diff_dicts(before_dict, after_dict),
+        "diff rows": lambda: diff_rows(plan, before, after),
+    }
+    for name, case in cases.items():
+        seconds = min(timeit.repeat(case, number=number, repeat=5))
+        print(f"{name:<20} {seconds / number * 1e6:8.2f} us/op")
+
+
+if __name__ == "__main__":
+    main()
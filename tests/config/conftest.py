@@ -3,7 +3,12 @@ import re
 
 import pytest
 from django.db import connection, connections
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
 from awesome_audit_log.conf import get_setting
+from awesome_audit_log.db import get_audit_database_manager
+from tests.config.settings import AWESOME_AUDIT_LOG
 
 LOG_TABLE_REGEX = re.compile(r".*_log$")
 
@@ -127,3 +132,40 @@ def fetch_logs_for(base_table: str) -> list[dict]:
                     pass
         out.append(rec)
     return out
+
+
+def selects_on(table: str, queries: CaptureQueriesContext) -> list[str]:
+    """The SELECTs on ``table`` captured by ``queries``."""
+    return [
+        q["sql"]
+        for q in queries.captured_queries
+        if q["sql"].startswith("SELECT") and f'FROM "{table}"' in q["sql"]
+    ]
+
+
+def widget_options(**options):
+    """Override the MODEL_OPTIONS of the test app's Widget model."""
+    return override_settings(
+        AWESOME_AUDIT_LOG={
+            **AWESOME_AUDIT_LOG,
+            "MODEL_OPTIONS": {"tests_testapp.widget": options},
+        }
+    )
+
+
+class AuditLogTestCase(TransactionTestCase):
+    """
+    Starts every test without the log tables of ``log_tables`` and with a
+    fresh audit database manager, so they are created (and cached) anew.
+    """
+
+    reset_sequences = True
+    # tables whose log table is dropped before each test
+    log_tables = ("widget",)
+
+    def setUp(self):
+        super().setUp()
+        with connection.cursor() as c:
+            for table in self.log_tables:
+                c.execute(f"DROP TABLE IF EXISTS {table}_log")
+        get_audit_database_manager().reset()
@@ -12,3 +12,13 @@ class Widget(models.Model):
 class Category(models.Model):
     name = models.CharField(max_length=100)
     updated_at = models.DateTimeField(auto_now=True)
+
+
+class Part(models.Model):
+    widget = models.ForeignKey(Widget, on_delete=models.CASCADE, related_name="parts")
+    label = models.CharField(max_length=100)
+
+
+class Bundle(models.Model):
+    name = models.CharField(max_length=100)
+    widgets = models.ManyToManyField(Widget, related_name="bundles")
@@ -1,5 +1,7 @@
+from unittest.mock import patch
+
 import pytest
-from django.db import connections
+from django.db import connections, transaction
 from django.test import TransactionTestCase, override_settings
 
 from tests.config.conftest import fetch_logs_for
@@ -186,3 +188,20 @@ class TestAuditMySQL(TransactionTestCase):
         ]
 
         self.assertEqual(len(widget_logs), 0)
+
+    def test_batch_split_under_max_allowed_packet(self):
+        with transaction.atomic():
+            widgets = [Widget.objects.create(name="x" * 50, qty=i) for i in range(20)]
+
+        with patch(
+            "awesome_audit_log.db.MySQlDatabaseVendor._get_max_allowed_packet",
+            return_value=4096,
+        ):
+            with transaction.atomic():
+                for w in widgets:
+                    w.qty += 100
+                    w.save()
+
+        updates = [r for r in fetch_logs_for("widget") if r["action"] == "update"]
+        self.assertEqual(len(updates), 20)
+        self.assertEqual({r["after"]["qty"] for r in updates}, set(range(100, 120)))
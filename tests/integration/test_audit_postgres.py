@@ -1,7 +1,10 @@
+from unittest.mock import patch
+
 import pytest
-from django.db import connections
+from django.db import connections, transaction
 from django.test import TransactionTestCase, override_settings
 
+from awesome_audit_log.db import PostgresDatabaseVendor
 from tests.config.conftest import fetch_logs_for
 from tests.config.settings import AWESOME_AUDIT_LOG
 from tests.fixtures.testapp.models import Category, Widget
@@ -221,3 +224,52 @@ class TestAuditPostgreSQL(TransactionTestCase):
             widget_logs[0]["after"]["name"], "postgres_with_different_schema_widget"
         )
         self.assertEqual(widget_logs[0]["after"]["qty"], 2)
+
+    @override_settings(
+        AWESOME_AUDIT_LOG={
+            **AWESOME_AUDIT_LOG,
+            "DATABASE_ALIAS": "postgres",
+            "PG_COPY": True,
+        }
+    )
+    def test_batched_rows_written_with_copy(self):
+        with patch.object(
+            PostgresDatabaseVendor,
+            "bulk_write_rows",
+            autospec=True,
+            side_effect=PostgresDatabaseVendor.bulk_write_rows,
+        ) as bulk_write_rows:
+            with transaction.atomic():
+                widgets = [Widget.objects.create(name=f"W{i}", qty=i) for i in range(3)]
+
+        bulk_write_rows.assert_called_once()
+        _vendor, _connection, rows = bulk_write_rows.call_args.args
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(bulk_write_rows.call_args.kwargs["table_name"], "widget_log")
+
+        logs = fetch_logs_for("widget")
+        self.assertEqual(
+            sorted(r["object_pk"] for r in logs), sorted(str(w.pk) for w in widgets)
+        )
+        self.assertEqual({r["after"]["qty"] for r in logs}, {0, 1, 2})
+
+    @override_settings(
+        AWESOME_AUDIT_LOG={
+            **AWESOME_AUDIT_LOG,
+            "DATABASE_ALIAS": "postgres_with_different_schema",
+            "PG_SCHEMA": "audit_log",
+            "PG_COPY": True,
+        }
+    )
+    def test_copy_writes_to_configured_schema(self):
+        conn = connections["postgres_with_different_schema"]
+        with conn.cursor() as cursor:
+            cursor.execute("CREATE SCHEMA IF NOT EXISTS audit_log;")
+
+        with transaction.atomic():
+            Widget.objects.create(name="A", qty=1)
+            Widget.objects.create(name="B", qty=2)
+
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM audit_log.widget_log;")
+            self.assertEqual(cursor.fetchone()[0], 2)
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import threading
+
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, override_settings
+
+from awesome_audit_log.aio import (
+    AsyncioWriter,
+    aflush_audit_writer,
+    bind_event_loop,
+    get_asyncio_writer,
+)
+from tests.config.conftest import AuditLogTestCase, fetch_logs_for
+from tests.config.settings import AWESOME_AUDIT_LOG
+from tests.fixtures.testapp.models import Widget
+
+
+@override_settings(
+    AWESOME_AUDIT_LOG={**AWESOME_AUDIT_LOG, "ASYNC": True, "ASYNC_MODE": "asyncio"}
+)
+class TestAsyncioWriter(AuditLogTestCase):
+    async def test_rows_are_written_by_loop_task(self):
+        bind_event_loop()
+        w = await Widget.objects.acreate(name="A", qty=1)
+        w.qty = 2
+        await w.asave()
+        # the rows wait on the loop's queue for the batch to fill
+        self.assertEqual(await sync_to_async(fetch_logs_for)("widget"), [])
+
+        await get_asyncio_writer().aclose()
+
+        rows = await sync_to_async(fetch_logs_for)("widget")
+        self.assertEqual([r["action"] for r in rows], ["update", "insert"])
+
+    @override_settings(
+        AWESOME_AUDIT_LOG={
+            **AWESOME_AUDIT_LOG,
+            "ASYNC": True,
+            "ASYNC_MODE": "asyncio",
+            "ASYNC_FLUSH_INTERVAL": 0.05,
+        }
+    )
+    async def test_partial_batch_is_written_after_flush_interval(self):
+        bind_event_loop()
+        await Widget.objects.acreate(name="A", qty=1)
+        task = get_asyncio_writer()._task
+
+        for _ in range(100):
+            await asyncio.sleep(0.05)
+            if await sync_to_async(fetch_logs_for)("widget"):
+                break
+
+        self.assertEqual(len(await sync_to_async(fetch_logs_for)("widget")), 1)
+        self.assertFalse(task.done())
+
+    async def test_request_context_is_kept_across_awaits(self):
+        resp = await AsyncClient().post(
+            "/api/widgets/create/",
+            data=json.dumps({"name": "C", "qty": 7}),
+            content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 200)
+        await asyncio.sleep(0)
+        await aflush_audit_writer()
+
+        rows = await sync_to_async(fetch_logs_for)("widget")
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["entry_point"], "http")
+        self.assertEqual(rows[0]["path"], "/api/widgets/create/")
+
+    def test_rows_outside_loop_are_written_synchronously(self):
+        Widget.objects.create(name="A", qty=1)
+
+        self.assertIsNone(get_asyncio_writer())
+        self.assertEqual(len(fetch_logs_for("widget")), 1)
+
+    def test_stopped_loop_takes_no_rows(self):
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        writer = AsyncioWriter(
+            loop, queue_size=10, batch_size=10, flush_interval=1, queue_full="drop"
+        )
+
+        self.assertFalse(writer.put_threadsafe(Widget, [{}]))
+
+    async def test_settings_change_stops_task_and_writes_queue(self):
+        bind_event_loop()
+        await Widget.objects.acreate(name="A", qty=1)
+        task = get_asyncio_writer()._task
+
+        with override_settings(AWESOME_AUDIT_LOG={**AWESOME_AUDIT_LOG}):
+            await asyncio.wait([task], timeout=1)
+
+        self.assertTrue(task.cancelled())
+        rows = await sync_to_async(fetch_logs_for)("widget")
+        self.assertEqual([r["action"] for r in rows], ["insert"])
+
+    def test_stop_from_another_thread_returns_queued_rows(self):
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever)
+        thread.start()
+        self.addCleanup(loop.close)
+        self.addCleanup(thread.join)
+        self.addCleanup(loop.call_soon_threadsafe, loop.stop)
+        writer = AsyncioWriter(
+            loop, queue_size=10, batch_size=10, flush_interval=60, queue_full="drop"
+        )
+        writer.put_threadsafe(Widget, [{"object_pk": "1"}, {"object_pk": "2"}])
+        # the rows are queued by the loop
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0), loop).result()
+        task = writer._task
+
+        batch = writer.stop()
+
+        self.assertEqual([p["object_pk"] for _, p in batch], ["1", "2"])
+        self.assertIsNone(writer._task)
+        asyncio.run_coroutine_threadsafe(asyncio.wait([task]), loop).result()
+        self.assertTrue(task.cancelled())
@@ -0,0 +1,62 @@
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+
+from awesome_audit_log.db import (
+    AuditDatabaseManager,
+    _chunks_under,
+    _load_data_value,
+    get_audit_database_manager,
+)
+from tests.config.conftest import AuditLogTestCase, fetch_logs_for
+from tests.fixtures.testapp.models import Widget
+
+
+class TestAuditDatabaseManager(AuditLogTestCase):
+    def test_manager_is_shared(self):
+        self.assertIs(get_audit_database_manager(), get_audit_database_manager())
+
+    def test_only_first_write_checks_the_log_table(self):
+        manager = AuditDatabaseManager()
+        payload = {"action": "insert", "object_pk": "1", "created_at": "now"}
+
+        with CaptureQueriesContext(connection) as queries:
+            manager.insert_log_row(Widget, payload)
+        self.assertGreater(len(queries), 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            manager.insert_log_row(Widget, payload)
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(queries[0]["sql"].startswith("INSERT INTO widget_log"))
+        self.assertEqual(len(fetch_logs_for("widget")), 2)
+
+    def test_dropped_log_table_is_recreated(self):
+        manager = AuditDatabaseManager()
+        payload = {"action": "insert", "object_pk": "1", "created_at": "now"}
+        manager.insert_log_row(Widget, payload)
+
+        with connection.cursor() as c:
+            c.execute("DROP TABLE widget_log")
+
+        manager.insert_log_row(Widget, payload)
+        self.assertEqual(len(fetch_logs_for("widget")), 1)
+
+
+class TestMySQLBulkWriter(SimpleTestCase):
+    def test_rows_are_chunked_under_packet_size(self):
+        rows = [["x" * 10, 1] for _ in range(5)]
+
+        # a row is 3 + (2 * 10 + 3) + 25 = 51 bytes at most
+        chunks = list(_chunks_under(rows, 110))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+
+    def test_oversized_row_is_sent_alone(self):
+        rows = [["x" * 100], ["y"]]
+
+        self.assertEqual(list(_chunks_under(rows, 10)), [[["x" * 100]], [["y"]]])
+
+    def test_load_data_values_are_escaped(self):
+        self.assertEqual(_load_data_value(None), "\\N")
+        self.assertEqual(_load_data_value(1.5), "1.5")
+        self.assertEqual(_load_data_value('{"a": "b\\tc"}\n'), '{"a": "b\\\\tc"}\\n')
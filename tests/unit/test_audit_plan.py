@@ -0,0 +1,40 @@
+from django.test import TestCase, override_settings
+
+from awesome_audit_log.plans import get_audit_plan
+from awesome_audit_log.utils import serialize_instance
+from tests.config.settings import AWESOME_AUDIT_LOG
+from tests.fixtures.testapp.models import Category, Widget
+
+
+class TestAuditPlan(TestCase):
+    def test_plan_is_cached_per_model(self):
+        self.assertIs(get_audit_plan(Widget), get_audit_plan(Widget))
+        self.assertIsNot(get_audit_plan(Widget), get_audit_plan(Category))
+
+    def test_plan_describes_model(self):
+        plan = get_audit_plan(Widget)
+        self.assertTrue(plan.audited)
+        self.assertEqual(plan.label, "tests_testapp.widget")
+        self.assertEqual(plan.attnames, ("id", "name", "qty"))
+        self.assertEqual(len(plan.converters), len(plan.attnames))
+        self.assertEqual(plan.log_table, "widget_log")
+
+    def test_plan_is_rebuilt_when_settings_change(self):
+        self.assertTrue(get_audit_plan(Widget).audited)
+        with override_settings(
+            AWESOME_AUDIT_LOG={
+                **AWESOME_AUDIT_LOG,
+                "NOT_AUDIT_MODELS": ["tests_testapp.widget"],
+            }
+        ):
+            self.assertFalse(get_audit_plan(Widget).audited)
+            self.assertTrue(get_audit_plan(Category).audited)
+        self.assertTrue(get_audit_plan(Widget).audited)
+
+    @override_settings(AWESOME_AUDIT_LOG={"ENABLED": False})
+    def test_nothing_is_audited_when_disabled(self):
+        self.assertFalse(get_audit_plan(Widget).audited)
+
+    def test_serialize_instance_follows_plan(self):
+        w = Widget(pk=3, name="A", qty=2)
+        self.assertEqual(serialize_instance(w), {"id": 3, "name": "A", "qty": 2})
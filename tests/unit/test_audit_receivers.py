@@ -0,0 +1,48 @@
+from django.contrib.sessions.models import Session
+from django.db.models.signals import post_init, post_save, pre_delete, pre_save
+from django.test import TestCase, override_settings
+
+from awesome_audit_log import tasks
+from tests.config.settings import AWESOME_AUDIT_LOG
+from tests.fixtures.testapp.models import Category, Widget
+
+
+class TestAuditReceivers(TestCase):
+    def test_receivers_connected_to_audited_models(self):
+        for signal in (pre_save, post_save, pre_delete):
+            self.assertTrue(signal.has_listeners(Widget))
+            self.assertTrue(signal.has_listeners(Category))
+
+    @override_settings(
+        AWESOME_AUDIT_LOG={
+            **AWESOME_AUDIT_LOG,
+            "AUDIT_MODELS": ["tests_testapp.category"],
+        }
+    )
+    def test_receivers_not_connected_to_unaudited_models(self):
+        for signal in (pre_save, post_save, pre_delete):
+            self.assertFalse(signal.has_listeners(Widget))
+            self.assertFalse(signal.has_listeners(Session))
+            self.assertTrue(signal.has_listeners(Category))
+
+    @override_settings(
+        AWESOME_AUDIT_LOG={
+            **AWESOME_AUDIT_LOG,
+            "NOT_AUDIT_MODELS": ["tests_testapp.widget"],
+        }
+    )
+    def test_receivers_reconnected_after_settings_change(self):
+        self.assertFalse(pre_save.has_listeners(Widget))
+        with override_settings(AWESOME_AUDIT_LOG=AWESOME_AUDIT_LOG):
+            self.assertTrue(pre_save.has_listeners(Widget))
+        self.assertFalse(pre_save.has_listeners(Widget))
+
+    def test_post_init_only_connected_when_tracking_loaded_state(self):
+        self.assertFalse(post_init.has_listeners(Widget))
+        with override_settings(
+            AWESOME_AUDIT_LOG={**AWESOME_AUDIT_LOG, "TRACK_LOADED_STATE": True}
+        ):
+            self.assertTrue(post_init.has_listeners(Widget))
+
+    def test_async_task_keeps_its_name(self):
+        self.assertEqual(tasks.insert_audit_log_async.name, tasks.ASYNC_TASK_NAME)
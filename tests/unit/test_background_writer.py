@@ -0,0 +1,105 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+from django.apps import apps
+from django.db import transaction
+from django.test import override_settings
+
+from awesome_audit_log.writer import BackgroundWriter, get_background_writer
+from tests.config.conftest import AuditLogTestCase, fetch_logs_for
+from tests.config.settings import AWESOME_AUDIT_LOG
+from tests.fixtures.testapp.models import Widget
+
+
+def _thread_mode(**options):
+    return override_settings(
+        AWESOME_AUDIT_LOG={
+            **AWESOME_AUDIT_LOG,
+            "ASYNC": True,
+            "ASYNC_MODE": "thread",
+            **options,
+        }
+    )
+
+
+class TestBackgroundWriter(AuditLogTestCase):
+    def setUp(self):
+        super().setUp()
+        # no writer thread, the queue is drained by calling flush()
+        patcher = patch("awesome_audit_log.writer.BackgroundWriter._start")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @_thread_mode()
+    def test_rows_are_written_by_writer(self):
+        w = Widget.objects.create(name="A", qty=1)
+        with transaction.atomic():
+            w.qty = 2
+            w.save()
+
+        self.assertEqual(fetch_logs_for("widget"), [])
+        get_background_writer().flush()
+
+        actions = [r["action"] for r in fetch_logs_for("widget")]
+        self.assertEqual(actions, ["update", "insert"])
+
+    @_thread_mode(ASYNC_QUEUE_SIZE=1, ASYNC_QUEUE_FULL="drop")
+    def test_full_queue_drops_rows(self):
+        with self.assertLogs("awesome_audit_log.writer", "WARNING"):
+            Widget.objects.create(name="A", qty=1)
+            Widget.objects.create(name="B", qty=1)
+
+        get_background_writer().flush()
+
+        self.assertEqual(get_background_writer().dropped, 1)
+        self.assertEqual([r["object_pk"] for r in fetch_logs_for("widget")], ["1"])
+
+    @_thread_mode(ASYNC_QUEUE_SIZE=1, ASYNC_QUEUE_FULL="sync")
+    def test_full_queue_writes_synchronously(self):
+        Widget.objects.create(name="A", qty=1)
+        Widget.objects.create(name="B", qty=1)
+
+        self.assertEqual([r["object_pk"] for r in fetch_logs_for("widget")], ["2"])
+        get_background_writer().flush()
+        self.assertEqual(len(fetch_logs_for("widget")), 2)
+
+    @_thread_mode()
+    def test_celery_worker_process_shutdown_flushes_queue(self):
+        signals = pytest.importorskip("celery.signals")
+        apps.get_app_config("awesome_audit_log")._setup_celery_writer_flush()
+        Widget.objects.create(name="A", qty=1)
+
+        signals.worker_process_shutdown.send(sender=None, pid=1, exitcode=0)
+
+        self.assertEqual(len(fetch_logs_for("widget")), 1)
+
+
+class TestWriterThread(AuditLogTestCase):
+    def _writer(self):
+        writer = BackgroundWriter(
+            queue_size=10, batch_size=10, flush_interval=0.05, queue_full="drop"
+        )
+        self.addCleanup(writer.stop)
+        return writer
+
+    def test_dead_thread_is_restarted(self):
+        writer = self._writer()
+        # the thread of a forked process
+        writer._thread = threading.Thread(target=lambda: None)
+        writer._thread.start()
+        writer._thread.join()
+
+        writer._start()
+
+        self.assertTrue(writer._thread.is_alive())
+
+    @_thread_mode()
+    def test_stop_waits_for_writer_thread(self):
+        writer = get_background_writer()
+        Widget.objects.create(name="A", qty=1)
+
+        writer.stop()
+
+        self.assertFalse(writer._thread.is_alive())
+        self.assertEqual(len(fetch_logs_for("widget")), 1)
@@ -0,0 +1,156 @@
+from django.db import connection, transaction
+from django.db.models import F
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from awesome_audit_log.db import get_audit_database_manager
+from tests.config.conftest import AuditLogTestCase, fetch_logs_for
+from tests.config.settings import AWESOME_AUDIT_LOG
+from tests.fixtures.testapp.models import Widget
+
+
+@override_settings(
+    AWESOME_AUDIT_LOG={**AWESOME_AUDIT_LOG, "CAPTURE_BULK_OPERATIONS": True}
+)
+class TestBulkOperations(AuditLogTestCase):
+    def test_bulk_create_is_audited(self):
+        widgets = Widget.objects.bulk_create(
+            [Widget(name=f"W{i}", qty=i) for i in range(3)]
+        )
+
+        logs = fetch_logs_for("widget")
+        self.assertEqual(len(logs), 3)
+        by_pk = {r["object_pk"]: r for r in logs}
+        for w in widgets:
+            row = by_pk[str(w.pk)]
+            self.assertEqual(row["action"], "insert")
+            self.assertIsNone(row["before"])
+            self.assertEqual(row["after"]["qty"], w.qty)
+
+    def test_bulk_create_rows_written_in_one_statement(self):
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                Widget.objects.bulk_create([Widget(name="W", qty=i) for i in range(4)])
+
+        inserts = [q["sql"] for q in queries if "INSERT INTO widget_log" in q["sql"]]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(len(fetch_logs_for("widget")), 4)
+
+    def test_bulk_create_with_ignore_conflicts_is_not_audited(self):
+        Widget.objects.create(name="A", qty=1)
+        Widget.objects.bulk_create(
+            [Widget(pk=1, name="A", qty=2), Widget(pk=2, name="B", qty=1)],
+            ignore_conflicts=True,
+        )
+
+        self.assertEqual([r["action"] for r in fetch_logs_for("widget")], ["insert"])
+
+    def test_bulk_create_with_update_conflicts_records_updates(self):
+        Widget.objects.create(name="A", qty=1)
+        Widget.objects.bulk_create(
+            [Widget(pk=1, name="not saved", qty=5), Widget(pk=2, name="B", qty=1)],
+            update_conflicts=True,
+            unique_fields=["pk"],
+            update_fields=["qty"],
+        )
+
+        rows = {(r["action"], r["object_pk"]): r for r in fetch_logs_for("widget")}
+        self.assertEqual(set(rows), {("insert", "1"), ("update", "1"), ("insert", "2")})
+        update = rows[("update", "1")]
+        self.assertEqual(update["changes"], {"qty": {"from": 1, "to": 5}})
+        self.assertEqual(update["after"]["name"], "A")
+        self.assertEqual(rows[("insert", "2")]["after"]["name"], "B")
+
+    def test_bulk_update_is_audited(self):
+        widgets = [Widget.objects.create(name=f"W{i}", qty=i) for i in range(3)]
+        for w in widgets:
+            w.qty += 10
+            w.name = "not saved"
+
+        with CaptureQueriesContext(connection) as queries:
+            Widget.objects.bulk_update(widgets, ["qty"], batch_size=2)
+
+        selects = [
+            q["sql"]
+            for q in queries
+            if q["sql"].startswith("SELECT") and 'FROM "widget"' in q["sql"]
+        ]
+        self.assertEqual(len(selects), 2)
+
+        updates = [r for r in fetch_logs_for("widget") if r["action"] == "update"]
+        self.assertEqual(len(updates), 3)
+        by_pk = {r["object_pk"]: r for r in updates}
+        for i, w in enumerate(widgets):
+            row = by_pk[str(w.pk)]
+            self.assertEqual(row["changes"], {"qty": {"from": i, "to": i + 10}})
+            self.assertEqual(row["after"]["name"], f"W{i}")
+
+    @override_settings(AWESOME_AUDIT_LOG=AWESOME_AUDIT_LOG)
+    def test_bulk_operations_not_audited_by_default(self):
+        widgets = Widget.objects.bulk_create([Widget(name="W", qty=1)])
+        widgets[0].qty = 2
+        Widget.objects.bulk_update(widgets, ["qty"])
+
+        self.assertEqual(fetch_logs_for("widget"), [])
+
+    def test_queryset_update_is_audited_with_insert_select(self):
+        widgets = [Widget.objects.create(name=f"W{i}", qty=i) for i in range(3)]
+
+        with CaptureQueriesContext(connection) as queries:
+            updated = Widget.objects.filter(qty__gte=1).update(qty=F("qty") + 5)
+
+        self.assertEqual(updated, 2)
+        self.assertFalse(
+            any(q["sql"].startswith('SELECT "widget"') for q in queries),
+            "rows must not be loaded into Python",
+        )
+        self.assertTrue(
+            any(q["sql"].startswith("INSERT INTO widget_log") for q in queries)
+        )
+
+        updates = [r for r in fetch_logs_for("widget") if r["action"] == "update"]
+        self.assertEqual(
+            sorted(r["object_pk"] for r in updates),
+            [str(widgets[1].pk), str(widgets[2].pk)],
+        )
+        by_pk = {r["object_pk"]: r for r in updates}
+        row = by_pk[str(widgets[2].pk)]
+        self.assertEqual(row["changes"], {"qty": {"from": 2, "to": 7}})
+        self.assertEqual(row["before"]["qty"], 2)
+        self.assertEqual(row["after"]["qty"], 7)
+        self.assertEqual(row["after"]["name"], "W2")
+
+    def test_queryset_update_audit_rolls_back_with_update(self):
+        Widget.objects.create(name="W", qty=1)
+
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                Widget.objects.update(name="changed")
+                raise RuntimeError
+
+        self.assertEqual(
+            [r for r in fetch_logs_for("widget") if r["action"] == "update"], []
+        )
+
+    def test_queryset_update_in_transaction_runs_no_ddl(self):
+        Widget.objects.create(name="W", qty=1)
+        with connection.cursor() as c:
+            c.execute("DROP TABLE widget_log")
+        get_audit_database_manager().reset()
+
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as queries:
+                Widget.objects.filter(qty=1).update(qty=5)
+
+        self.assertEqual([q for q in queries if "CREATE TABLE" in q["sql"]], [])
+        update = fetch_logs_for("widget")[0]
+        self.assertEqual(update["changes"], {"qty": {"from": 1, "to": 5}})
+
+    def test_bulk_update_is_not_audited_twice(self):
+        widgets = [Widget.objects.create(name="W", qty=i) for i in range(2)]
+        for w in widgets:
+            w.qty += 1
+        Widget.objects.bulk_update(widgets, ["qty"])
+
+        updates = [r for r in fetch_logs_for("widget") if r["action"] == "update"]
+        self.assertEqual(len(updates), 2)
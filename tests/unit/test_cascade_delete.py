@@ -0,0 +1,93 @@
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from tests.config.conftest import AuditLogTestCase, fetch_logs_for
+from tests.config.settings import AWESOME_AUDIT_LOG
+from tests.fixtures.testapp.models import Category, Part, Widget
+
+
+class TestCascadeDelete(AuditLogTestCase):
+    log_tables = ("widget", Part._meta.db_table)
+
+    def _group_id(self, table: str, object_pk: str) -> str:
+        with connection.cursor() as c:
+            c.execute(
+                f"SELECT group_id FROM {table}_log "
+                "WHERE action = 'delete' AND object_pk = %s",
+                [object_pk],
+            )
+            return c.fetchone()[0]
+
+    def test_cascade_is_logged_per_model_with_shared_group(self):
+        widget = Widget.objects.create(name="W", qty=1)
+        parts = [Part.objects.create(widget=widget, label=f"P{i}") for i in range(3)]
+        widget_pk = str(widget.pk)
+
+        with CaptureQueriesContext(connection) as queries:
+            widget.delete()
+
+        part_table = Part._meta.db_table
+        inserts = [q["sql"] for q in queries if "_log" in q["sql"]]
+        self.assertEqual(len(inserts), 2)
+
+        part_deletes = [
+            r for r in fetch_logs_for(part_table) if r["action"] == "delete"
+        ]
+        self.assertEqual(len(part_deletes), 3)
+        self.assertEqual(part_deletes[0]["after"], None)
+        self.assertIn(part_deletes[0]["before"]["label"], {"P0", "P1", "P2"})
+
+        widget_deletes = [
+            r for r in fetch_logs_for("widget") if r["action"] == "delete"
+        ]
+        self.assertEqual(len(widget_deletes), 1)
+        self.assertEqual(widget_deletes[0]["before"]["name"], "W")
+
+        group_id = self._group_id("widget", widget_pk)
+        self.assertTrue(group_id)
+        for part in parts:
+            self.assertEqual(self._group_id(part_table, str(part.pk)), group_id)
+
+    def test_separate_deletes_get_separate_groups(self):
+        first = Widget.objects.create(name="A", qty=1)
+        second = Widget.objects.create(name="B", qty=1)
+        first_pk, second_pk = str(first.pk), str(second.pk)
+
+        first.delete()
+        second.delete()
+
+        self.assertNotEqual(
+            self._group_id("widget", first_pk), self._group_id("widget", second_pk)
+        )
+
+    def test_group_id_column_added_to_existing_log_table(self):
+        with connection.cursor() as c:
+            c.execute(
+                "CREATE TABLE widget_log (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "action TEXT NOT NULL, object_pk TEXT NOT NULL, before TEXT, "
+                "after TEXT, changes TEXT, entry_point TEXT, route TEXT, path TEXT, "
+                "method TEXT, ip TEXT, user_id INTEGER, user_name TEXT, "
+                "user_agent TEXT, created_at TEXT NOT NULL)"
+            )
+
+        widget = Widget.objects.create(name="A", qty=1)
+        widget_pk = str(widget.pk)
+        widget.delete()
+
+        self.assertTrue(self._group_id("widget", widget_pk))
+
+    @override_settings(
+        AWESOME_AUDIT_LOG={
+            **AWESOME_AUDIT_LOG,
+            "NOT_AUDIT_MODELS": ["tests_testapp.category"],
+        }
+    )
+    def test_unaudited_delete_runs_in_no_transaction(self):
+        category = Category.objects.create(name="C")
+
+        with CaptureQueriesContext(connection) as queries:
+            category.delete()
+
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(queries[0]["sql"].startswith("DELETE"))
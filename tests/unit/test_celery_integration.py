@@ -2,9 +2,14 @@
 Test Celery integration for async audit logging.
 """
 
+import os
+import subprocess
+import sys
+
 import pytest
 from unittest.mock import patch, MagicMock
 
+from django.apps import apps
 from django.test import TestCase, override_settings
 
 from tests.fixtures.testapp.models import Widget
@@ -13,6 +18,7 @@ from awesome_audit_log.tasks import (
     insert_audit_log_async,
     insert_audit_log_sync,
 )
+from awesome_audit_log.apps import _uses_celery
 from awesome_audit_log.signals import _insert_audit_log
 
 
@@ -69,7 +75,7 @@ class CeleryIntegrationTestCase(TestCase):
             mock_sync.assert_called_once_with(self.model, self.payload)
             mock_async.delay.assert_not_called()
 
-    @patch("awesome_audit_log.db.AuditDatabaseManager")
+    @patch("awesome_audit_log.db.get_audit_database_manager")
     def test_insert_audit_log_sync(self, mock_audit_manager):
         """Test synchronous audit log insertion."""
         mock_instance = MagicMock()
@@ -81,7 +87,7 @@ class CeleryIntegrationTestCase(TestCase):
         mock_instance.insert_log_row.assert_called_once_with(self.model, self.payload)
 
     @patch("awesome_audit_log.tasks.apps.get_model")
-    @patch("awesome_audit_log.db.AuditDatabaseManager")
+    @patch("awesome_audit_log.db.get_audit_database_manager")
     def test_insert_audit_log_async_success(self, mock_audit_manager, mock_get_model):
         """Test successful asynchronous audit log insertion."""
         mock_model = MagicMock()
@@ -97,7 +103,7 @@ class CeleryIntegrationTestCase(TestCase):
 
     @patch("awesome_audit_log.tasks.insert_audit_log_async.retry")
     @patch("awesome_audit_log.tasks.apps.get_model")
-    @patch("awesome_audit_log.db.AuditDatabaseManager")
+    @patch("awesome_audit_log.db.get_audit_database_manager")
     def test_insert_audit_log_async_retry_on_failure(
         self, mock_audit_manager, mock_get_model, mock_retry
     ):
@@ -149,6 +155,44 @@ class CeleryIntegrationTestCase(TestCase):
 class CeleryEntryPointTestCase(TestCase):
     """Test Celery task entry point context capture."""
 
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # the test settings don't load a Celery app before Django is ready
+        apps.get_app_config("awesome_audit_log")._setup_celery_auditing()
+
+    def test_celery_is_not_imported_when_unused(self):
+        with patch.dict(sys.modules):
+            sys.modules.pop("celery", None)
+            self.assertFalse(_uses_celery())
+            with override_settings(
+                AWESOME_AUDIT_LOG={"ASYNC": True, "ASYNC_MODE": "celery"}
+            ):
+                self.assertTrue(_uses_celery())
+
+    def test_thread_mode_does_not_import_celery(self):
+        code = (
+            "import sys, django\n"
+            "from django.conf import settings\n"
+            "settings.AWESOME_AUDIT_LOG = {'ASYNC': True, 'ASYNC_MODE': 'thread'}\n"
+            "django.setup()\n"
+            "import awesome_audit_log.tasks\n"
+            "print('celery' in sys.modules)\n"
+        )
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": "tests.config.settings",
+            "PYTHONPATH": os.pathsep.join(sys.path),
+        }
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.strip(), "False")
+
     @override_settings(AWESOME_AUDIT_LOG={"CAPTURE_CELERY": True})
     def test_celery_task_captures_context_in_signal(self):
         """Test that Celery task signals set audit context properly."""
@@ -0,0 +1,106 @@
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from tests.config.conftest import AuditLogTestCase, fetch_logs_for, selects_on
+from tests.config.settings import AWESOME_AUDIT_LOG
+from tests.fixtures.testapp.models import Widget
+
+
+@override_settings(
+    AWESOME_AUDIT_LOG={**AWESOME_AUDIT_LOG, "COALESCE_TRANSACTION_ROWS": True}
+)
+class TestCoalescing(AuditLogTestCase):
+    def test_updates_are_merged_into_one_row(self):
+        w = Widget.objects.create(name="A", qty=1)
+
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                w.qty = 2
+                w.save()
+                w.name = "B"
+                w.save(update_fields=["name"])
+                w.qty = 3
+                w.save()
+
+        self.assertEqual(len(selects_on("widget", queries)), 1)
+        (update,) = [r for r in fetch_logs_for("widget") if r["action"] == "update"]
+        self.assertEqual(update["before"], {"id": 1, "name": "A", "qty": 1})
+        self.assertEqual(update["after"], {"id": 1, "name": "B", "qty": 3})
+        self.assertEqual(
+            update["changes"],
+            {"name": {"from": "A", "to": "B"}, "qty": {"from": 1, "to": 3}},
+        )
+
+    def test_insert_then_update_is_one_insert(self):
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                w = Widget.objects.create(name="A", qty=1)
+                w.qty = 2
+                w.save()
+
+        self.assertEqual(selects_on("widget", queries), [])
+        (row,) = fetch_logs_for("widget")
+        self.assertEqual(row["action"], "insert")
+        self.assertEqual(row["before"], None)
+        self.assertEqual(row["after"], {"id": 1, "name": "A", "qty": 2})
+
+    def test_insert_then_delete_leaves_no_row(self):
+        with transaction.atomic():
+            w = Widget.objects.create(name="A", qty=1)
+            w.qty = 2
+            w.save()
+            w.delete()
+            kept = Widget.objects.create(name="B", qty=1)
+
+        rows = fetch_logs_for("widget")
+        self.assertEqual([r["object_pk"] for r in rows], [str(kept.pk)])
+
+    def test_update_then_delete_is_one_delete_of_the_original_row(self):
+        w = Widget.objects.create(name="A", qty=1)
+        pk = str(w.pk)
+
+        with transaction.atomic():
+            w.qty = 2
+            w.save()
+            w.delete()
+
+        rows = [r for r in fetch_logs_for("widget") if r["object_pk"] == pk]
+        self.assertEqual([r["action"] for r in rows], ["delete", "insert"])
+        self.assertEqual(rows[0]["before"], {"id": 1, "name": "A", "qty": 1})
+
+    def test_rows_of_a_savepoint_are_not_merged_into_its_parent(self):
+        with transaction.atomic():
+            w = Widget.objects.create(name="A", qty=1)
+            try:
+                with transaction.atomic():
+                    w.qty = 2
+                    w.save()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+
+        (row,) = fetch_logs_for("widget")
+        self.assertEqual(row["after"], {"id": 1, "name": "A", "qty": 1})
+
+    def test_rows_are_not_merged_across_a_savepoint(self):
+        w = Widget.objects.create(name="A", qty=1)
+        with transaction.atomic():
+            w.qty = 2
+            w.save()
+            with transaction.atomic():
+                w.qty = 3
+                w.save()
+            w.qty = 4
+            w.save()
+
+        afters = [r["after"]["qty"] for r in reversed(fetch_logs_for("widget"))]
+        self.assertEqual(afters, [1, 2, 3, 4])
+
+    def test_rows_outside_transactions_are_not_merged(self):
+        w = Widget.objects.create(name="A", qty=1)
+        w.qty = 2
+        w.save()
+
+        actions = [r["action"] for r in fetch_logs_for("widget")]
+        self.assertEqual(actions, ["update", "insert"])
@@ -0,0 +1,117 @@
+from unittest.mock import patch
+
+from django.db import transaction
+
+from awesome_audit_log.debounce import get_debouncer
+from tests.config.conftest import AuditLogTestCase, fetch_logs_for, widget_options
+from tests.fixtures.testapp.models import Widget
+
+
+class TestDebouncing(AuditLogTestCase):
+    def setUp(self):
+        super().setUp()
+        # no flusher thread, windows are closed by calling flush()
+        self.addCleanup(get_debouncer().clear)
+        patcher = patch.object(get_debouncer(), "_start")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @widget_options(DEBOUNCE=30)
+    def test_updates_within_window_are_merged(self):
+        w = Widget.objects.create(name="A", qty=1)
+        for qty in (2, 3, 4):
+            w.qty = qty
+            w.save()
+
+        self.assertEqual([r["action"] for r in fetch_logs_for("widget")], ["insert"])
+        get_debouncer().flush(force=True)
+
+        update = fetch_logs_for("widget")[0]
+        self.assertEqual(update["action"], "update")
+        self.assertEqual(update["before"]["qty"], 1)
+        self.assertEqual(update["after"]["qty"], 4)
+        self.assertEqual(update["changes"], {"qty": {"from": 1, "to": 4}})
+
+    @widget_options(DEBOUNCE=30)
+    @patch("awesome_audit_log.debounce.time.monotonic", return_value=0.0)
+    def test_flush_writes_rows_whose_window_is_over(self, monotonic):
+        first = Widget.objects.create(name="A", qty=1)
+        second = Widget.objects.create(name="B", qty=1)
+        first.qty = 2
+        first.save()
+        monotonic.return_value = 20.0
+        second.qty = 2
+        second.save()
+
+        monotonic.return_value = 30.0
+        get_debouncer().flush()
+
+        updates = [r for r in fetch_logs_for("widget") if r["action"] == "update"]
+        self.assertEqual([r["object_pk"] for r in updates], [str(first.pk)])
+
+    @widget_options(DEBOUNCE=30)
+    def test_rolled_back_updates_are_not_debounced(self):
+        w = Widget.objects.create(name="A", qty=1)
+        with transaction.atomic():
+            w.qty = 2
+            w.save()
+            transaction.set_rollback(True)
+        w.qty = 3
+        w.save()
+
+        get_debouncer().flush(force=True)
+
+        update = fetch_logs_for("widget")[0]
+        self.assertEqual(update["changes"], {"qty": {"from": 1, "to": 3}})
+
+    @widget_options(DEBOUNCE={"seconds": 30, "fields": ["qty"]})
+    def test_updates_of_other_fields_are_written_right_away(self):
+        w = Widget.objects.create(name="A", qty=1)
+        w.qty = 2
+        w.save()
+        w.name = "B"
+        w.save()
+
+        rows = fetch_logs_for("widget")
+        self.assertEqual([r["action"] for r in rows], ["update", "update", "insert"])
+        self.assertEqual(rows[1]["changes"], {"qty": {"from": 1, "to": 2}})
+        self.assertEqual(rows[0]["changes"], {"name": {"from": "A", "to": "B"}})
+
+    @widget_options(DEBOUNCE=30)
+    def test_delete_writes_pending_update_first(self):
+        w = Widget.objects.create(name="A", qty=1)
+        w.qty = 2
+        w.save()
+        w.delete()
+
+        actions = [r["action"] for r in fetch_logs_for("widget")]
+        self.assertEqual(actions, ["delete", "update", "insert"])
+
+    @widget_options(DEBOUNCE=30)
+    def test_delete_in_transaction_writes_its_updates_first(self):
+        w = Widget.objects.create(name="A", qty=1)
+        w.qty = 2
+        w.save()
+        with transaction.atomic():
+            w.qty = 3
+            w.save()
+            w.delete()
+
+        rows = fetch_logs_for("widget")
+        actions = [r["action"] for r in rows]
+        self.assertEqual(actions, ["delete", "update", "update", "insert"])
+        self.assertEqual(rows[2]["changes"], {"qty": {"from": 1, "to": 2}})
+        self.assertEqual(rows[1]["changes"], {"qty": {"from": 2, "to": 3}})
+
+    @widget_options(DEBOUNCE=30)
+    def test_rolled_back_delete_keeps_pending_update(self):
+        w = Widget.objects.create(name="A", qty=1)
+        w.qty = 2
+        w.save()
+        with transaction.atomic():
+            Widget.objects.get(pk=w.pk).delete()
+            transaction.set_rollback(True)
+
+        self.assertEqual([r["action"] for r in fetch_logs_for("widget")], ["insert"])
+        get_debouncer().flush(force=True)
+        self.assertEqual(fetch_logs_for("widget")[0]["action"], "update")
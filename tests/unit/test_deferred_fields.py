@@ -0,0 +1,41 @@
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from awesome_audit_log.utils import serialize_instance
+from tests.config.conftest import fetch_logs_for, selects_on
+from tests.fixtures.testapp.models import Widget
+
+
+class TestDeferredFields(TransactionTestCase):
+    reset_sequences = True
+
+    def test_serialize_does_not_load_deferred_fields(self):
+        pk = Widget.objects.create(name="A", qty=1).pk
+        w = Widget.objects.only("qty").get(pk=pk)
+
+        with CaptureQueriesContext(connection) as queries:
+            data = serialize_instance(w)
+
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(data, {"id": pk, "qty": 1})
+        self.assertEqual(w.get_deferred_fields(), {"name"})
+
+    def test_deferred_values_come_from_fallback(self):
+        pk = Widget.objects.create(name="A", qty=1).pk
+        w = Widget.objects.only("qty").get(pk=pk)
+
+        data = serialize_instance(w, fallback={"name": "A"})
+
+        self.assertEqual(data, {"id": pk, "name": "A", "qty": 1})
+
+    def test_delete_of_deferred_instance_does_not_load_fields(self):
+        pk = Widget.objects.create(name="A", qty=1).pk
+        w = Widget.objects.only("qty").get(pk=pk)
+
+        with CaptureQueriesContext(connection) as queries:
+            w.delete()
+
+        self.assertEqual(selects_on("widget", queries), [])
+        delete = [r for r in fetch_logs_for("widget") if r["action"] == "delete"][0]
+        self.assertEqual(delete["before"], {"id": pk, "qty": 1})
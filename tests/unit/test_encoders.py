@@ -0,0 +1,70 @@
+import datetime as dt
+import decimal
+import json
+import sys
+import uuid
+from importlib.util import find_spec
+from unittest import mock, skipUnless
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from awesome_audit_log.utils import dumps, get_encoder
+from tests.config.settings import AWESOME_AUDIT_LOG
+
+PAYLOAD = {
+    "price": decimal.Decimal("9.99"),
+    "at": dt.datetime(2024, 1, 2, 3, 4, 5, tzinfo=dt.timezone.utc),
+    "on": dt.date(2024, 1, 2),
+    "ref": uuid.UUID(int=1),
+    "name": "Zoë",
+    "tags": [1, 2],
+}
+
+EXPECTED = {
+    "price": 9.99,
+    "at": "2024-01-02T03:04:05+00:00",
+    "on": "2024-01-02",
+    "ref": "00000000-0000-0000-0000-000000000001",
+    "name": "Zoë",
+    "tags": [1, 2],
+}
+
+
+def _encoder_settings(name: str):
+    return override_settings(AWESOME_AUDIT_LOG={**AWESOME_AUDIT_LOG, "ENCODER": name})
+
+
+class TestEncoders(SimpleTestCase):
+    def _assert_encodes(self, name: str):
+        with _encoder_settings(name):
+            encoded = dumps(PAYLOAD)
+        self.assertEqual(json.loads(encoded), EXPECTED)
+        self.assertNotIn(" ", encoded.replace("Zoë", ""))
+
+    def test_json(self):
+        self._assert_encodes("json")
+
+    @skipUnless(find_spec("orjson"), "orjson is not installed")
+    def test_orjson(self):
+        self._assert_encodes("orjson")
+
+    @skipUnless(find_spec("msgspec"), "msgspec is not installed")
+    def test_msgspec(self):
+        self._assert_encodes("msgspec")
+
+    def test_auto(self):
+        self._assert_encodes("auto")
+
+    def test_encoder_is_built_once(self):
+        with _encoder_settings("json"):
+            self.assertIs(get_encoder(), get_encoder())
+
+    def test_missing_encoder_falls_back_to_json(self):
+        with mock.patch.dict(sys.modules, {"msgspec": None}):
+            with self.assertLogs("awesome_audit_log.utils", "WARNING"):
+                self._assert_encodes("msgspec")
+
+    def test_unknown_encoder(self):
+        with _encoder_settings("yaml"), self.assertRaises(ImproperlyConfigured):
+            dumps({})
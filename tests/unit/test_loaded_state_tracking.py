@@ -0,0 +1,86 @@
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from tests.config.conftest import fetch_logs_for, selects_on
+from tests.config.settings import AWESOME_AUDIT_LOG
+from tests.fixtures.testapp.models import Widget
+
+
+@override_settings(AWESOME_AUDIT_LOG={**AWESOME_AUDIT_LOG, "TRACK_LOADED_STATE": True})
+class TestLoadedStateTracking(TransactionTestCase):
+    reset_sequences = True
+
+    def test_update_of_loaded_instance_does_not_select(self):
+        pk = Widget.objects.create(name="A", qty=1).pk
+        w = Widget.objects.get(pk=pk)
+        w.qty = 2
+
+        with CaptureQueriesContext(connection) as queries:
+            w.save()
+
+        self.assertEqual(selects_on("widget", queries), [])
+        update = [r for r in fetch_logs_for("widget") if r["action"] == "update"][0]
+        self.assertEqual(update["changes"], {"qty": {"from": 1, "to": 2}})
+
+    def test_repeated_saves_use_last_saved_state(self):
+        w = Widget.objects.create(name="A", qty=1)
+        w.qty = 2
+        w.save()
+        w.qty = 3
+
+        with CaptureQueriesContext(connection) as queries:
+            w.save()
+
+        self.assertEqual(selects_on("widget", queries), [])
+        update = [r for r in fetch_logs_for("widget") if r["action"] == "update"][0]
+        self.assertEqual(update["changes"], {"qty": {"from": 2, "to": 3}})
+
+    def test_instance_not_loaded_from_db_falls_back_to_select(self):
+        pk = Widget.objects.create(name="A", qty=1).pk
+        w = Widget(pk=pk, name="A", qty=5)
+
+        with CaptureQueriesContext(connection) as queries:
+            w.save()
+
+        self.assertEqual(len(selects_on("widget", queries)), 1)
+        update = [r for r in fetch_logs_for("widget") if r["action"] == "update"][0]
+        self.assertEqual(update["changes"], {"qty": {"from": 1, "to": 5}})
+
+    def test_deferred_instance_only_records_loaded_fields(self):
+        # Django saves deferred instances with update_fields set to the
+        # loaded fields, so only those are read and recorded
+        pk = Widget.objects.create(name="A", qty=1).pk
+        w = Widget.objects.only("qty").get(pk=pk)
+        w.qty = 2
+
+        with CaptureQueriesContext(connection) as queries:
+            w.save()
+
+        self.assertEqual(selects_on("widget", queries), [])
+        update = [r for r in fetch_logs_for("widget") if r["action"] == "update"][0]
+        self.assertNotIn("name", update["before"])
+        self.assertEqual(update["changes"], {"qty": {"from": 1, "to": 2}})
+
+    def test_refresh_from_db_updates_loaded_state(self):
+        w = Widget.objects.create(name="A", qty=1)
+        Widget.objects.filter(pk=w.pk).update(qty=7)
+        w.refresh_from_db()
+        w.qty = 8
+
+        with CaptureQueriesContext(connection) as queries:
+            w.save()
+
+        self.assertEqual(selects_on("widget", queries), [])
+        update = fetch_logs_for("widget")[0]
+        self.assertEqual(update["changes"], {"qty": {"from": 7, "to": 8}})
+
+    def test_refresh_of_some_fields(self):
+        w = Widget.objects.create(name="A", qty=1)
+        Widget.objects.filter(pk=w.pk).update(qty=7)
+        w.refresh_from_db(fields=["qty"])
+        w.qty = 8
+        w.save()
+
+        update = fetch_logs_for("widget")[0]
+        self.assertEqual(update["changes"], {"qty": {"from": 7, "to": 8}})
@@ -0,0 +1,67 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.config.conftest import AuditLogTestCase, fetch_logs_for
+from tests.fixtures.testapp.models import Bundle, Widget
+
+
+class TestManyToManyAuditing(AuditLogTestCase):
+    log_tables = ("widget", Bundle._meta.db_table)
+
+    def setUp(self):
+        super().setUp()
+        self.table = Bundle._meta.db_table
+        self.bundle = Bundle.objects.create(name="B")
+        self.widgets = [Widget.objects.create(name=f"W{i}", qty=i) for i in range(3)]
+
+    def _m2m_logs(self, table: str) -> list[dict]:
+        return [r for r in fetch_logs_for(table) if r["action"].startswith("m2m_")]
+
+    def test_add_is_one_row_with_related_pks(self):
+        self.bundle.widgets.add(*self.widgets)
+
+        rows = self._m2m_logs(self.table)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["action"], "m2m_add")
+        self.assertEqual(rows[0]["object_pk"], str(self.bundle.pk))
+        self.assertEqual(rows[0]["changes"], {"widgets": {"add": [1, 2, 3]}})
+
+    def test_remove_and_clear(self):
+        self.bundle.widgets.add(*self.widgets)
+        self.bundle.widgets.remove(self.widgets[0])
+        self.bundle.widgets.clear()
+
+        rows = self._m2m_logs(self.table)
+        self.assertEqual(
+            [(r["action"], r["changes"]) for r in rows],
+            [
+                ("m2m_clear", {"widgets": {"clear": [2, 3]}}),
+                ("m2m_remove", {"widgets": {"remove": [1]}}),
+                ("m2m_add", {"widgets": {"add": [1, 2, 3]}}),
+            ],
+        )
+
+    def test_set_writes_its_rows_in_one_statement(self):
+        self.bundle.widgets.add(self.widgets[0])
+
+        with CaptureQueriesContext(connection) as queries:
+            self.bundle.widgets.set(self.widgets[1:])
+
+        inserts = [q["sql"] for q in queries if f"{self.table}_log" in q["sql"]]
+        self.assertEqual(len(inserts), 1)
+        actions = [r["action"] for r in self._m2m_logs(self.table)]
+        self.assertEqual(actions, ["m2m_add", "m2m_remove", "m2m_add"])
+
+    def test_reverse_side_is_logged_on_related_model(self):
+        self.widgets[0].bundles.add(self.bundle)
+
+        rows = self._m2m_logs("widget")
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["object_pk"], str(self.widgets[0].pk))
+        self.assertEqual(rows[0]["changes"], {"bundles": {"add": [self.bundle.pk]}})
+
+    def test_noop_add_writes_nothing(self):
+        self.bundle.widgets.add(self.widgets[0])
+        self.bundle.widgets.add(self.widgets[0])
+
+        self.assertEqual(len(self._m2m_logs(self.table)), 1)
@@ -0,0 +1,47 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from awesome_audit_log.plans import get_audit_plan
+from tests.config.conftest import AuditLogTestCase, fetch_logs_for, widget_options
+from tests.fixtures.testapp.models import Widget
+
+
+class TestModelFields(AuditLogTestCase):
+    @widget_options(FIELDS=["name"])
+    def test_fields_narrow_the_plan(self):
+        self.assertEqual(get_audit_plan(Widget).attnames, ("name",))
+
+    @widget_options(EXCLUDE_FIELDS=["qty"])
+    def test_exclude_fields_narrow_the_plan(self):
+        self.assertEqual(get_audit_plan(Widget).attnames, ("id", "name"))
+
+    @widget_options(EXCLUDE_FIELDS=["qty"])
+    def test_excluded_fields_are_never_fetched_or_stored(self):
+        w = Widget.objects.create(name="A", qty=1)
+        w.name = "B"
+        w.qty = 2
+
+        with CaptureQueriesContext(connection) as queries:
+            w.save()
+
+        (select,) = [
+            q["sql"]
+            for q in queries
+            if q["sql"].startswith("SELECT") and 'FROM "widget"' in q["sql"]
+        ]
+        self.assertNotIn('"widget"."qty"', select)
+        update = [r for r in fetch_logs_for("widget") if r["action"] == "update"][0]
+        self.assertEqual(update["before"], {"id": 1, "name": "A"})
+        self.assertEqual(update["changes"], {"name": {"from": "A", "to": "B"}})
+
+    @widget_options(EXCLUDE_FIELDS=["qty"])
+    def test_saving_only_excluded_fields_is_not_recorded(self):
+        w = Widget.objects.create(name="A", qty=1)
+        w.qty = 2
+
+        with CaptureQueriesContext(connection) as queries:
+            w.save(update_fields=["qty"])
+
+        self.assertEqual(len(queries), 1)
+        actions = [r["action"] for r in fetch_logs_for("widget")]
+        self.assertEqual(actions, ["insert"])
@@ -0,0 +1,82 @@
+from django.test import override_settings
+
+from tests.config.conftest import AuditLogTestCase, fetch_logs_for
+from tests.config.settings import AWESOME_AUDIT_LOG
+from tests.fixtures.testapp.models import Category, Widget
+
+
+def _updates(table: str) -> list[dict]:
+    return [r for r in fetch_logs_for(table) if r["action"] == "update"]
+
+
+class _LogTablesTestCase(AuditLogTestCase):
+    category_table = Category._meta.db_table
+    log_tables = ("widget", category_table)
+
+
+@override_settings(AWESOME_AUDIT_LOG={**AWESOME_AUDIT_LOG, "SKIP_NOOP_UPDATES": True})
+class TestSkipNoopUpdates(_LogTablesTestCase):
+    def test_idempotent_save_is_not_recorded(self):
+        w = Widget.objects.create(name="A", qty=1)
+        w.save()
+
+        self.assertEqual(_updates("widget"), [])
+
+    def test_real_change_is_recorded(self):
+        w = Widget.objects.create(name="A", qty=1)
+        w.qty = 2
+        w.save()
+
+        self.assertEqual(len(_updates("widget")), 1)
+
+    def test_auto_now_only_change_is_not_recorded(self):
+        c = Category.objects.create(name="A")
+        c.save()
+        c.name = "B"
+        c.save()
+
+        updates = _updates(self.category_table)
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(set(updates[0]["changes"]), {"name", "updated_at"})
+
+    def test_bulk_update_skips_unchanged_objects(self):
+        widgets = [Widget.objects.create(name=f"W{i}", qty=i) for i in range(3)]
+        widgets[0].qty = 10
+        with override_settings(
+            AWESOME_AUDIT_LOG={
+                **AWESOME_AUDIT_LOG,
+                "SKIP_NOOP_UPDATES": True,
+                "CAPTURE_BULK_OPERATIONS": True,
+            }
+        ):
+            Widget.objects.bulk_update(widgets, ["qty"])
+
+        updates = _updates("widget")
+        self.assertEqual([r["object_pk"] for r in updates], [str(widgets[0].pk)])
+
+
+class TestSkipNoopUpdatesPerModel(_LogTablesTestCase):
+    @override_settings(
+        AWESOME_AUDIT_LOG={
+            **AWESOME_AUDIT_LOG,
+            "MODEL_OPTIONS": {"tests_testapp.Widget": {"SKIP_NOOP_UPDATES": True}},
+        }
+    )
+    def test_model_option_enables_skipping(self):
+        Widget.objects.create(name="A", qty=1).save()
+        Category.objects.create(name="A").save()
+
+        self.assertEqual(_updates("widget"), [])
+        self.assertEqual(len(_updates(self.category_table)), 1)
+
+    @override_settings(
+        AWESOME_AUDIT_LOG={
+            **AWESOME_AUDIT_LOG,
+            "SKIP_NOOP_UPDATES": True,
+            "MODEL_OPTIONS": {"tests_testapp.widget": {"SKIP_NOOP_UPDATES": False}},
+        }
+    )
+    def test_model_option_overrides_global_setting(self):
+        Widget.objects.create(name="A", qty=1).save()
+
+        self.assertEqual(len(_updates("widget")), 1)
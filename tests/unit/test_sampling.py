@@ -0,0 +1,82 @@
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+
+from awesome_audit_log.sampling import Sampler, TokenBucket
+from tests.config.conftest import AuditLogTestCase, fetch_logs_for, widget_options
+from tests.fixtures.testapp.models import Widget
+
+
+class TestSampler(SimpleTestCase):
+    @patch("awesome_audit_log.sampling.time.monotonic")
+    def test_token_bucket_refills_at_rate(self, monotonic):
+        monotonic.return_value = 0.0
+        bucket = TokenBucket(rate=2, burst=2)
+
+        self.assertEqual([bucket.take() for _ in range(3)], [True, True, False])
+        monotonic.return_value = 0.5
+        self.assertEqual([bucket.take() for _ in range(2)], [True, False])
+
+    @patch("awesome_audit_log.sampling.random.random")
+    def test_sample_rate(self, random):
+        sampler = Sampler(sample_rate=0.25)
+
+        random.return_value = 0.1
+        self.assertEqual(sampler.sample(), 0.25)
+        random.return_value = 0.3
+        self.assertIsNone(sampler.sample())
+
+    @patch("awesome_audit_log.sampling.time.monotonic", return_value=0.0)
+    def test_rate_limited_events_lower_the_next_rate(self, monotonic):
+        sampler = Sampler(rate_limit={"rate": 1, "burst": 1})
+
+        self.assertEqual(sampler.sample(), 1.0)
+        self.assertIsNone(sampler.sample())
+        self.assertIsNone(sampler.sample())
+        monotonic.return_value = 1.0
+        self.assertAlmostEqual(sampler.sample(), 1 / 3)
+
+
+class TestSampledAuditing(AuditLogTestCase):
+    def _sample_rates(self) -> list:
+        with connection.cursor() as c:
+            c.execute("SELECT sample_rate FROM widget_log ORDER BY id")
+            return [row[0] for row in c.fetchall()]
+
+    @widget_options(SAMPLE_RATE=0)
+    def test_sampled_out_saves_fetch_nothing(self):
+        w = Widget.objects.create(name="A", qty=1)
+        w.qty = 2
+
+        with CaptureQueriesContext(connection) as queries:
+            w.save()
+            w.delete()
+
+        selects = [
+            q["sql"]
+            for q in queries
+            if q["sql"].startswith("SELECT") and 'FROM "widget"' in q["sql"]
+        ]
+        self.assertEqual(selects, [])
+        self.assertEqual(fetch_logs_for("widget"), [])
+
+    @widget_options(SAMPLE_RATE=0.5)
+    @patch("awesome_audit_log.sampling.random.random", return_value=0.1)
+    def test_sampled_rows_record_their_rate(self, random):
+        w = Widget.objects.create(name="A", qty=1)
+        random.return_value = 0.9
+        w.qty = 2
+        w.save()
+        random.return_value = 0.1
+        w.delete()
+
+        actions = [r["action"] for r in fetch_logs_for("widget")]
+        self.assertEqual(actions, ["delete", "insert"])
+        self.assertEqual(self._sample_rates(), [0.5, 0.5])
+
+    def test_rows_are_not_sampled_by_default(self):
+        Widget.objects.create(name="A", qty=1)
+
+        self.assertEqual(self._sample_rates(), [None])
@@ -0,0 +1,82 @@
+import datetime as dt
+import decimal
+import uuid
+
+from django.db import models
+from django.test import SimpleTestCase
+
+from awesome_audit_log.plans import get_audit_plan
+from awesome_audit_log.utils import (
+    _to_primitive,
+    converter_for_field,
+    diff_dicts,
+    diff_rows,
+    row_to_dict,
+    serialize_row,
+)
+from tests.fixtures.testapp.models import Part, Widget
+
+
+class TestFieldConverters(SimpleTestCase):
+    def test_converters_match_generic_conversion(self):
+        cases = [
+            (models.IntegerField(), 3),
+            (models.BooleanField(), True),
+            (models.FloatField(), 1.5),
+            (models.CharField(), "a"),
+            (models.DecimalField(), decimal.Decimal("1.25")),
+            (models.DateTimeField(), dt.datetime(2024, 1, 2, 3, 4, 5)),
+            (models.DateField(), dt.date(2024, 1, 2)),
+            (models.TimeField(), dt.time(3, 4, 5)),
+            (models.DurationField(), dt.timedelta(seconds=90)),
+            (models.UUIDField(), uuid.UUID(int=1)),
+        ]
+        for field, value in cases:
+            with self.subTest(field=type(field).__name__):
+                convert = converter_for_field(field)
+                self.assertEqual(convert(value), _to_primitive(value))
+                self.assertIsNone(convert(None))
+
+    def test_json_values_are_kept_as_json(self):
+        convert = converter_for_field(models.JSONField())
+        value = {"a": [1, {"b": None}], "c": decimal.Decimal("1.5")}
+        self.assertEqual(convert(value), {"a": [1, {"b": None}], "c": 1.5})
+        self.assertEqual(convert(["x", 2]), ["x", 2])
+        self.assertEqual(convert("x"), "x")
+
+    def test_unexpected_types_fall_back_to_generic_conversion(self):
+        convert = converter_for_field(models.IntegerField())
+        self.assertEqual(convert(decimal.Decimal("1.5")), 1.5)
+        convert = converter_for_field(models.DateField())
+        self.assertEqual(convert("2024-01-02"), "2024-01-02")
+
+    def test_relation_uses_target_field_converter(self):
+        field = Part._meta.get_field("widget")
+        self.assertIs(
+            converter_for_field(field),
+            converter_for_field(Widget._meta.pk),
+        )
+
+
+class TestRows(SimpleTestCase):
+    def setUp(self):
+        self.plan = get_audit_plan(Widget)
+
+    def test_row_is_positional(self):
+        row = serialize_row(self.plan, Widget(pk=3, name="A", qty=2))
+        self.assertEqual(row, (3, "A", 2))
+        self.assertEqual(row_to_dict(self.plan, row), {"id": 3, "name": "A", "qty": 2})
+
+    def test_diff_rows_matches_diff_dicts(self):
+        before = (1, "A", 1)
+        after = (1, "B", models.DEFERRED)
+        rows = [(None, before), (before, after), (after, before), (before, before)]
+        for old, new in rows:
+            with self.subTest(before=old, after=new):
+                self.assertEqual(
+                    diff_rows(self.plan, old, new),
+                    diff_dicts(
+                        None if old is None else row_to_dict(self.plan, old),
+                        row_to_dict(self.plan, new),
+                    ),
+                )
@@ -0,0 +1,97 @@
+import json
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from awesome_audit_log.db import SQLiteDatabaseVendor, get_audit_database_manager
+from tests.config.conftest import AuditLogTestCase
+from tests.config.settings import AWESOME_AUDIT_LOG
+from tests.fixtures.testapp.models import Category, Widget
+
+
+class TestSQLiteTuning(AuditLogTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.audit_file = Path(directory.name) / "audit.sqlite3"
+        self.addCleanup(self._detach)
+
+    def _detach(self):
+        schema = SQLiteDatabaseVendor.ATTACHED_SCHEMA
+        with connection.cursor() as c:
+            c.execute("SELECT 1 FROM pragma_database_list WHERE name = %s", (schema,))
+            if c.fetchone() is not None:
+                c.execute(f"DETACH DATABASE {schema}")
+        get_audit_database_manager().reset()
+
+    def _settings(self, **options):
+        return override_settings(
+            AWESOME_AUDIT_LOG={
+                **AWESOME_AUDIT_LOG,
+                "SQLITE_ATTACH": str(self.audit_file),
+                **options,
+            }
+        )
+
+    def test_log_tables_are_kept_in_attached_file(self):
+        with self._settings():
+            w = Widget.objects.create(name="A", qty=1)
+            w.qty = 2
+            w.save()
+
+        with connection.cursor() as c:
+            c.execute("SELECT 1 FROM main.sqlite_master WHERE name = 'widget_log'")
+            self.assertIsNone(c.fetchone())
+        with sqlite3.connect(self.audit_file) as audit:
+            actions = audit.execute("SELECT action FROM widget_log ORDER BY id")
+            self.assertEqual([row[0] for row in actions], ["insert", "update"])
+
+    def test_wal_mode_and_busy_timeout(self):
+        with self._settings(SQLITE_WAL=True, SQLITE_BUSY_TIMEOUT=1234):
+            Widget.objects.create(name="A", qty=1)
+
+            with connection.cursor() as c:
+                c.execute("PRAGMA audit_log.journal_mode")
+                self.assertEqual(c.fetchone()[0], "wal")
+                c.execute("PRAGMA audit_log.synchronous")
+                self.assertEqual(c.fetchone()[0], 1)
+                c.execute("PRAGMA busy_timeout")
+                self.assertEqual(c.fetchone()[0], 1234)
+
+    def test_flush_is_written_in_one_transaction(self):
+        with self._settings(SQLITE_WAL=True):
+            Widget.objects.create(name="A", qty=1)
+            Category.objects.create(name="C")
+
+            with CaptureQueriesContext(connection) as queries:
+                with transaction.atomic():
+                    Widget.objects.create(name="B", qty=1)
+                    Category.objects.create(name="D")
+
+        inserts = [
+            q["sql"] for q in queries if q["sql"].startswith("INSERT INTO audit_log.")
+        ]
+        self.assertEqual(len(inserts), 2)
+        begins = [q["sql"] for q in queries if q["sql"] == "BEGIN"]
+        self.assertEqual(len(begins), 2)
+
+    def test_queryset_update_in_transaction_on_new_connection(self):
+        with self._settings(CAPTURE_BULK_OPERATIONS=True):
+            w = Widget.objects.create(name="A", qty=1)
+            # a new connection: the log table is known but not attached yet
+            with connection.cursor() as c:
+                c.execute(f"DETACH DATABASE {SQLiteDatabaseVendor.ATTACHED_SCHEMA}")
+            del get_audit_database_manager()._local.prepared
+
+            with transaction.atomic():
+                Widget.objects.filter(pk=w.pk).update(qty=5)
+
+        with sqlite3.connect(self.audit_file) as audit:
+            rows = audit.execute("SELECT action, after FROM widget_log ORDER BY id")
+            rows = [(action, json.loads(after)["qty"]) for action, after in rows]
+        self.assertEqual(rows, [("insert", 1), ("update", 5)])
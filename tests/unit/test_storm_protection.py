@@ -0,0 +1,105 @@
+from unittest import mock
+
+from django.db import transaction
+from django.test import override_settings
+
+from awesome_audit_log import storm
+from awesome_audit_log.context import (
+    RequestContext,
+    clear_request_ctx,
+    set_request_ctx,
+)
+from tests.config.conftest import AuditLogTestCase, fetch_logs_for
+from tests.config.settings import AWESOME_AUDIT_LOG
+from tests.fixtures.testapp.models import Widget
+
+
+@override_settings(AWESOME_AUDIT_LOG={**AWESOME_AUDIT_LOG, "STORM_THRESHOLD": 2})
+class TestStormProtection(AuditLogTestCase):
+    def setUp(self):
+        super().setUp()
+        set_request_ctx(RequestContext(entry_point="management_command", path="x"))
+        self.addCleanup(clear_request_ctx)
+
+    def test_events_past_threshold_are_summarized(self):
+        with self.assertLogs("awesome_audit_log.storm", "WARNING"):
+            widgets = [Widget.objects.create(name=f"W{i}", qty=i) for i in range(5)]
+        widgets[3].qty = 30
+        widgets[3].save(update_fields=["qty"])
+        widgets[4].delete()
+
+        rows = fetch_logs_for("widget")
+        self.assertEqual([r["action"] for r in rows], ["insert", "insert"])
+
+        clear_request_ctx()
+
+        summary = fetch_logs_for("widget")[0]
+        self.assertEqual(summary["action"], "summary")
+        self.assertEqual(summary["entry_point"], "management_command")
+        self.assertEqual(
+            summary["changes"],
+            {
+                "count": 5,
+                "actions": {"insert": 3, "update": 1, "delete": 1},
+                "pk_min": 3,
+                "pk_max": 5,
+                "pks": [3, 4, 5, 4, 5],
+                "fields": ["qty"],
+            },
+        )
+
+    def test_summarized_saves_fetch_nothing(self):
+        Widget.objects.create(name="A", qty=1)
+        Widget.objects.create(name="B", qty=1)
+        w = Widget(pk=1, name="A", qty=2)
+
+        with self.assertNumQueries(1), self.assertLogs("awesome_audit_log.storm"):
+            w.save()
+
+    def test_threshold_is_per_context(self):
+        for i in range(2):
+            Widget.objects.create(name=f"W{i}", qty=i)
+        clear_request_ctx()
+        set_request_ctx(RequestContext(entry_point="management_command", path="y"))
+        Widget.objects.create(name="W2", qty=2)
+
+        actions = [r["action"] for r in fetch_logs_for("widget")]
+        self.assertEqual(actions, ["insert", "insert", "insert"])
+
+    def test_rolled_back_events_are_not_summarized(self):
+        with self.assertLogs("awesome_audit_log.storm", "WARNING"):
+            widgets = [Widget.objects.create(name=f"W{i}", qty=i) for i in range(3)]
+        with transaction.atomic():
+            widgets[0].qty = 10
+            widgets[0].save(update_fields=["qty"])
+        try:
+            with transaction.atomic():
+                widgets[1].qty = 20
+                widgets[1].save(update_fields=["qty"])
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        clear_request_ctx()
+
+        summary = fetch_logs_for("widget")[0]
+        self.assertEqual(summary["changes"]["count"], 2)
+        self.assertEqual(summary["changes"]["actions"], {"insert": 1, "update": 1})
+        self.assertEqual(summary["changes"]["pks"], [3, 1])
+
+    def test_summary_is_written_every_so_many_events(self):
+        with (
+            mock.patch.object(storm, "SUMMARY_FLUSH_EVENTS", 2),
+            self.assertLogs("awesome_audit_log.storm", "WARNING"),
+        ):
+            for i in range(5):
+                Widget.objects.create(name=f"W{i}", qty=i)
+
+            rows = fetch_logs_for("widget")
+            self.assertEqual(rows[0]["action"], "summary")
+            self.assertEqual(rows[0]["changes"]["pks"], [3, 4])
+
+            clear_request_ctx()
+
+        rows = fetch_logs_for("widget")
+        self.assertEqual(rows[0]["changes"]["pks"], [5])
+        self.assertEqual(len(rows), 4)
@@ -0,0 +1,121 @@
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from awesome_audit_log import signals
+from awesome_audit_log.db import AuditDatabaseManager
+from tests.config.conftest import AuditLogTestCase, fetch_logs_for
+from tests.config.settings import AWESOME_AUDIT_LOG
+from tests.fixtures.testapp.models import Category, Widget
+
+
+class TestTransactionBuffer(AuditLogTestCase):
+    def test_rows_are_written_on_commit_in_one_statement(self):
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                for i in range(5):
+                    Widget.objects.create(name=f"W{i}", qty=i)
+                self.assertEqual(fetch_logs_for("widget"), [])
+
+        inserts = [q["sql"] for q in queries if "INSERT INTO widget_log" in q["sql"]]
+        self.assertEqual(len(inserts), 1)
+        self.assertTrue(inserts[0].startswith("5 times"))
+        self.assertEqual(len(fetch_logs_for("widget")), 5)
+
+    def test_rows_are_grouped_per_log_table(self):
+        with patch.object(
+            AuditDatabaseManager,
+            "write_log_rows",
+            autospec=True,
+            side_effect=AuditDatabaseManager.write_log_rows,
+        ) as write_log_rows:
+            with transaction.atomic():
+                Widget.objects.create(name="A", qty=1)
+                Category.objects.create(name="C")
+                Widget.objects.create(name="B", qty=2)
+
+        written = {
+            call.args[1]: len(call.args[2]) for call in write_log_rows.mock_calls
+        }
+        self.assertEqual(written, {Widget: 2, Category: 1})
+
+    def test_rolled_back_transaction_writes_nothing(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                Widget.objects.create(name="A", qty=1)
+                raise RuntimeError
+
+        self.assertEqual(fetch_logs_for("widget"), [])
+
+    def test_rolled_back_savepoint_drops_only_its_rows(self):
+        with transaction.atomic():
+            kept = Widget.objects.create(name="kept", qty=1)
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    Widget.objects.create(name="dropped", qty=2)
+                    raise RuntimeError
+            also_kept = Widget.objects.create(name="also kept", qty=3)
+
+        self.assertEqual(
+            sorted(r["object_pk"] for r in fetch_logs_for("widget")),
+            sorted([str(kept.pk), str(also_kept.pk)]),
+        )
+
+    def test_rows_after_a_savepoint_are_written_after_its_rows(self):
+        w = Widget.objects.create(name="A", qty=1)
+        with transaction.atomic():
+            w.qty = 2
+            w.save()
+            with transaction.atomic():
+                w.qty = 3
+                w.save()
+            w.qty = 4
+            w.save()
+
+        afters = [r["after"]["qty"] for r in reversed(fetch_logs_for("widget"))]
+        self.assertEqual(afters, [1, 2, 3, 4])
+
+    @override_settings(AWESOME_AUDIT_LOG={**AWESOME_AUDIT_LOG, "BATCH_SIZE": 2})
+    def test_batch_size_limits_rows_per_statement(self):
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                for i in range(5):
+                    Widget.objects.create(name=f"W{i}", qty=i)
+
+        inserts = [q["sql"] for q in queries if "INSERT INTO widget_log" in q["sql"]]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(len(fetch_logs_for("widget")), 5)
+
+    def test_rolled_back_rows_are_never_serialized(self):
+        with patch("awesome_audit_log.signals.dumps") as dumps:
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    w = Widget.objects.create(name="A", qty=1)
+                    w.qty = 2
+                    w.save()
+                    w.delete()
+                    raise RuntimeError
+
+        dumps.assert_not_called()
+
+    def test_rows_are_serialized_on_commit_with_event_time(self):
+        with patch(
+            "awesome_audit_log.signals.dumps", side_effect=signals.dumps
+        ) as dumps:
+            with transaction.atomic():
+                w = Widget.objects.create(name="saved", qty=1)
+                saved_at = datetime.now(timezone.utc)
+                # changed after the save, must not leak into its row
+                w.name = "not saved"
+                dumps.assert_not_called()
+
+        dumps.assert_called()
+        (row,) = fetch_logs_for("widget")
+        self.assertEqual(row["after"]["name"], "saved")
+        with connection.cursor() as c:
+            c.execute("SELECT created_at FROM widget_log")
+            created_at = datetime.fromisoformat(str(c.fetchone()[0]))
+        self.assertLessEqual(created_at.replace(tzinfo=timezone.utc), saved_at)
@@ -0,0 +1,62 @@
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from tests.config.conftest import fetch_logs_for, selects_on
+from tests.config.settings import AWESOME_AUDIT_LOG
+from tests.fixtures.testapp.models import Part, Widget
+
+
+class TestUpdateFields(TransactionTestCase):
+    reset_sequences = True
+
+    def test_pre_image_selects_only_updated_fields(self):
+        w = Widget.objects.create(name="A", qty=1)
+        w.qty = 2
+
+        with CaptureQueriesContext(connection) as queries:
+            w.save(update_fields=["qty"])
+
+        (select,) = selects_on("widget", queries)
+        self.assertIn('"widget"."qty"', select)
+        self.assertNotIn('"widget"."name"', select)
+
+    def test_row_is_limited_to_updated_fields(self):
+        w = Widget.objects.create(name="A", qty=1)
+        w.name = "not saved"
+        w.qty = 2
+        w.save(update_fields=["qty"])
+
+        update = [r for r in fetch_logs_for("widget") if r["action"] == "update"][0]
+        self.assertEqual(update["before"], {"qty": 1})
+        self.assertEqual(update["after"], {"qty": 2})
+        self.assertEqual(update["changes"], {"qty": {"from": 1, "to": 2}})
+
+    def test_foreign_key_by_field_name(self):
+        w1 = Widget.objects.create(name="A", qty=1)
+        w2 = Widget.objects.create(name="B", qty=1)
+        part = Part.objects.create(widget=w1, label="P")
+        part.widget = w2
+        part.save(update_fields=["widget"])
+
+        rows = fetch_logs_for(Part._meta.db_table)
+        update = [r for r in rows if r["action"] == "update"][0]
+        self.assertEqual(update["changes"], {"widget_id": {"from": w1.pk, "to": w2.pk}})
+
+
+@override_settings(AWESOME_AUDIT_LOG={**AWESOME_AUDIT_LOG, "TRACK_LOADED_STATE": True})
+class TestUpdateFieldsWithLoadedState(TransactionTestCase):
+    reset_sequences = True
+
+    def test_unsaved_fields_stay_in_loaded_state(self):
+        w = Widget.objects.create(name="A", qty=1)
+        w.name = "B"
+        w.qty = 2
+        w.save(update_fields=["qty"])
+
+        with CaptureQueriesContext(connection) as queries:
+            w.save()
+
+        self.assertEqual(selects_on("widget", queries), [])
+        update = [r for r in fetch_logs_for("widget") if r["action"] == "update"][0]
+        self.assertEqual(update["changes"], {"name": {"from": "A", "to": "B"}})